@@ -0,0 +1,276 @@
+"""Benchmarks each stage of the extraction and saving of paycheque PDFs."""
+import argparse
+from contextlib import contextmanager
+from functools import wraps
+import json
+import logging
+from pathlib import Path
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+from time import perf_counter
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'extract'))
+
+from utils.extraction import PaychequeData  # pylint: disable=wrong-import-position
+from utils.saving import CSVWriter  # pylint: disable=wrong-import-position
+from utils.schemas import TABLE_SCHEMAS  # pylint: disable=wrong-import-position
+from utils.utils import move_pdf  # pylint: disable=wrong-import-position
+
+
+# PaychequeData methods that are called many times per file (or wrap other
+# timed methods) and so are not timed as stages of their own
+UNTIMED_METHODS = ['_identify_table_coordinates', '_extract_from_pdf']
+
+# Percentiles reported for each stage
+PERCENTILES = [50, 95, 99]
+
+
+def _percentile(values, percent):
+    """Returns a percentile of the values (using linear interpolation)."""
+    if len(values) == 1:
+        return values[0]
+
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+@contextmanager
+def _time_methods(timings):
+    """Times each identify and extract method of PaychequeData.
+
+        Each call is recorded (in seconds) against the method name without
+        its leading underscore. The original methods are restored on exit.
+    """
+    originals = {
+        name: method for name, method in vars(PaychequeData).items()
+        if name.startswith(('_identify_', '_extract_')) and name not in UNTIMED_METHODS
+    }
+
+    def timed(stage, method):
+        @wraps(method)
+        def timed_method(*args, **kwargs):
+            start = perf_counter()
+
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings.setdefault(stage, []).append(perf_counter() - start)
+
+        return timed_method
+
+    for name, method in originals.items():
+        setattr(PaychequeData, name, timed(name.lstrip('_'), method))
+
+    try:
+        yield
+    finally:
+        for name, method in originals.items():
+            setattr(PaychequeData, name, method)
+
+def _time_stage(timings, stage, function, *args, **kwargs):
+    """Calls a function and records how long it took against a stage."""
+    start = perf_counter()
+    result = function(*args, **kwargs)
+    timings.setdefault(stage, []).append(perf_counter() - start)
+
+    return result
+
+def _extract_pages(timings, file, csv_writer, log):
+    """Extracts and saves each page of a PDF, timing each stage.
+
+        Returns:
+            int: the number of pages in the PDF.
+    """
+    pdf = _time_stage(timings, 'open', fitz.open, file)
+    page_count = pdf.page_count
+
+    for page_number in range(page_count):
+        # Each page is extracted from a PDF of its own (which it closes), as in the pipeline
+        if page_number > 0:
+            pdf = _time_stage(timings, 'open', fitz.open, file)
+
+        paycheque = _time_stage(timings, 'initialize', PaychequeData, pdf, log, page_number=page_number)
+        data = paycheque.data
+        paycheque.close()
+
+        _time_stage(timings, 'save_data', csv_writer.write, data, page_count > 1)
+
+    return page_count
+
+def run_benchmark(pdf_files, log):
+    """Extracts, saves and moves each PDF, timing each stage.
+
+        Every page of each PDF is extracted and saved (so the initialize
+        and save_data stages are timed once per page), and the throughput
+        is reported per page as well as per file. The PDFs are copied to
+        a temporary directory before they are moved, so the corpus itself
+        is left untouched.
+
+        Returns:
+            dict: the benchmark results.
+    """
+    timings = {}
+    file_times = []
+    page_total = 0
+
+    with tempfile.TemporaryDirectory() as temp_path, _time_methods(timings):
+        config = {
+            'pdf_extract_path': Path(temp_path, 'extract'),
+            'pdf_move_path': Path(temp_path, 'move'),
+            'data_path': Path(temp_path, 'data'),
+            'save_coordinates': False,
+            'tables': list(TABLE_SCHEMAS),
+        }
+
+        for path in ('pdf_extract_path', 'pdf_move_path', 'data_path'):
+            config[path].mkdir()
+
+        csv_writer = CSVWriter(log, config['data_path'], config['tables'])
+
+        for pdf_file in pdf_files:
+            file = Path(shutil.copy(pdf_file, config['pdf_extract_path']))
+            start = perf_counter()
+
+            page_total += _extract_pages(timings, file, csv_writer, log)
+
+            _time_stage(timings, 'move_pdf', move_pdf, file, config, log)
+
+            file_times.append(perf_counter() - start)
+
+        _time_stage(timings, 'commit', csv_writer.close)
+
+    timings['total'] = file_times
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'pymupdf': fitz.VersionBind,
+            'platform': platform.platform(),
+        },
+        'files': len(file_times),
+        'files_per_second': len(file_times) / sum(file_times),
+        'pages': page_total,
+        'pages_per_second': page_total / sum(file_times),
+        'stages': {
+            stage: {
+                'calls': len(values),
+                'mean_ms': statistics.fmean(values) * 1000,
+                **{f'p{percent}_ms': _percentile(values, percent) * 1000 for percent in PERCENTILES},
+            } for stage, values in timings.items()
+        },
+    }
+
+def compare_results(results, baseline, threshold):
+    """Compares results with a baseline.
+
+        Parameters:
+            results (dict): the benchmark results.
+            baseline (dict): the baseline benchmark results.
+            threshold (float): the fraction a stage's p50 latency (or the
+                throughput in pages) may worsen by before it is a
+                regression.
+
+        Returns:
+            list: a description of each regression.
+    """
+    regressions = []
+
+    # Baselines saved before pages were counted only have the throughput in files
+    unit = 'pages' if 'pages_per_second' in baseline else 'files'
+
+    if results[f'{unit}_per_second'] < baseline[f'{unit}_per_second'] * (1 - threshold):
+        regressions.append(
+            f'Throughput fell from {baseline[f"{unit}_per_second"]:.1f} to {results[f"{unit}_per_second"]:.1f} '
+            f'{unit}/s'
+        )
+
+    for stage, baseline_stage in baseline['stages'].items():
+        stage_results = results['stages'].get(stage)
+
+        if stage_results is None:
+            continue
+
+        if stage_results['p50_ms'] > baseline_stage['p50_ms'] * (1 + threshold):
+            regressions.append(
+                f'{stage}: p50 rose from {baseline_stage["p50_ms"]:.3f} to {stage_results["p50_ms"]:.3f} ms'
+            )
+
+    return regressions
+
+def print_results(results, baseline=None):
+    """Prints a table of the stage timings (and their p50 change from the baseline)."""
+    print(
+        f'{results["files"]} files ({results["pages"]} pages) at {results["files_per_second"]:.1f} files/s '
+        f'({results["pages_per_second"]:.1f} pages/s)'
+    )
+    print()
+    print(f'{"Stage":<50} {"Calls":>7} {"Mean ms":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"p50 vs base":>12}')
+
+    for stage, stage_results in results['stages'].items():
+        change = ''
+
+        if baseline and stage in baseline['stages']:
+            change = f'{stage_results["p50_ms"] / baseline["stages"][stage]["p50_ms"] - 1:+.1%}'
+
+        print(
+            f'{stage:<50} {stage_results["calls"]:>7} {stage_results["mean_ms"]:>9.3f} '
+            f'{stage_results["p50_ms"]:>9.3f} {stage_results["p95_ms"]:>9.3f} {stage_results["p99_ms"]:>9.3f} '
+            f'{change:>12}'
+        )
+
+def parse_arguments():
+    """Parses the command line arguments for the benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmarks the extraction of AHS paycheque PDFs.')
+    parser.add_argument('corpus', type=Path, help='directory of PDFs to benchmark with')
+    parser.add_argument('--limit', type=int, help='maximum number of PDFs to use')
+    parser.add_argument('--output', type=Path, help='path to save the results to (as JSON)')
+    parser.add_argument('--baseline', type=Path, help='path to baseline results to compare with')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='fraction a stage may slow down by before it is reported as a regression (default: 0.1)',
+    )
+
+    return parser.parse_args()
+
+def main():
+    """Runs the benchmark and compares it with any baseline."""
+    options = parse_arguments()
+
+    log = logging.getLogger('ahs-paycheque-extraction-benchmark')
+    log.addHandler(logging.StreamHandler())
+    log.setLevel(logging.ERROR)
+
+    pdf_files = sorted(options.corpus.glob('*.pdf'))[:options.limit]
+
+    if not pdf_files:
+        sys.exit(f'No PDFs found in {options.corpus}')
+
+    results = run_benchmark(pdf_files, log)
+    baseline = None
+
+    if options.baseline:
+        with open(options.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+
+    print_results(results, baseline)
+
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    if baseline:
+        regressions = compare_results(results, baseline, options.threshold)
+
+        for regression in regressions:
+            print(f'REGRESSION: {regression}')
+
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
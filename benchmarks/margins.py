@@ -0,0 +1,134 @@
+"""Benchmarks the page margin detection and confirms it matches the original."""
+import argparse
+from pathlib import Path
+import statistics
+import sys
+from time import perf_counter
+from types import SimpleNamespace
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'extract'))
+
+from utils.anchors import AnchorIndex  # pylint: disable=wrong-import-position
+from utils.extraction import PaychequeData  # pylint: disable=wrong-import-position
+from utils.templates import fingerprint_page  # pylint: disable=wrong-import-position
+
+
+def _reference_margins(page):
+    """Returns the margins found by walking every drawing (the original method)."""
+    min_x = None
+    max_x = None
+
+    for index, drawing in enumerate(page.get_drawings()):
+        for item in drawing['items']:
+            if item[0] == 'l':
+                x_values = [item[1][0], item[2][0]]
+            elif item[0] == 're':
+                x_values = [item[1][1], item[1][3]]
+            else:
+                continue
+
+            min_item_x = min(x_values)
+            max_item_x = max(x_values)
+
+            if index == 0:
+                min_x = min_item_x
+                max_x = max_item_x
+                continue
+
+            if min_item_x < min_x:
+                min_x = min_item_x
+
+            if max_item_x > max_x:
+                max_x = max_item_x
+
+    return min_x, max_x
+
+def _time(function, *args):
+    """Calls a function and returns its result and duration (in seconds)."""
+    start = perf_counter()
+    result = function(*args)
+
+    return result, perf_counter() - start
+
+def run_benchmark(pdf_files):
+    """Times each margin strategy on every PDF and checks their margins.
+
+        Returns:
+            tuple: the timings of each strategy and a list of mismatches.
+    """
+    timings = {'get_drawings': [], 'get_cdrawings': [], 'template': []}
+    templates = {}
+    mismatches = []
+
+    for pdf_file in pdf_files:
+        with fitz.open(pdf_file) as pdf:
+            page = pdf.load_page(0)
+
+            expected, seconds = _time(_reference_margins, page)
+            timings['get_drawings'].append(seconds)
+
+            measure_margins = PaychequeData._measure_margins  # pylint: disable=protected-access
+            margins, seconds = _time(measure_margins, SimpleNamespace(page=page))
+            timings['get_cdrawings'].append(seconds)
+
+            if margins != expected:
+                mismatches.append(f'{pdf_file}: raw drawings gave {margins}, expected {expected}')
+
+            # Pages with the same layout reuse the margins of the first one
+            template = templates.setdefault(fingerprint_page(page, AnchorIndex(page)), {})
+
+            if 'margins' in template:
+                margins, seconds = _time(tuple, template['margins'])
+                timings['template'].append(seconds)
+
+                if margins != expected:
+                    mismatches.append(f'{pdf_file}: layout template gave {margins}, expected {expected}')
+            else:
+                template['margins'] = list(expected)
+
+    print(f'{len(pdf_files)} files with {len(templates)} layouts')
+
+    return timings, mismatches
+
+def print_results(timings):
+    """Prints a table of the timings of each strategy."""
+    baseline = statistics.median(timings['get_drawings'])
+
+    print(f'{"Strategy":<20} {"Calls":>7} {"Mean ms":>9} {"p50 ms":>9} {"Speedup":>9}')
+
+    for strategy, values in timings.items():
+        if not values:
+            continue
+
+        median = statistics.median(values)
+
+        print(
+            f'{strategy:<20} {len(values):>7} {statistics.fmean(values) * 1000:>9.3f} '
+            f'{median * 1000:>9.3f} {baseline / median if median else float("inf"):>8.1f}x'
+        )
+
+def main():
+    """Runs the margin benchmark and exits with an error on any mismatch."""
+    parser = argparse.ArgumentParser(description='Benchmarks the page margin detection of AHS paycheque PDFs.')
+    parser.add_argument('corpus', type=Path, help='directory of PDFs to benchmark with')
+    parser.add_argument('--limit', type=int, help='maximum number of PDFs to use')
+    options = parser.parse_args()
+
+    pdf_files = sorted(options.corpus.glob('*.pdf'))[:options.limit]
+
+    if not pdf_files:
+        sys.exit(f'No PDFs found in {options.corpus}')
+
+    timings, mismatches = run_benchmark(pdf_files)
+    print_results(timings)
+
+    for mismatch in mismatches:
+        print(f'MISMATCH: {mismatch}')
+
+    if mismatches:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
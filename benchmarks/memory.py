@@ -0,0 +1,189 @@
+"""Checks that the memory of an extraction run stays flat as the number of PDFs grows."""
+import argparse
+import logging
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+from threading import Event, Thread
+from time import monotonic
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'extract'))
+
+from utils.pipeline import run_pipeline  # pylint: disable=wrong-import-position
+from utils.schemas import TABLE_SCHEMAS  # pylint: disable=wrong-import-position
+from utils.templates import TemplateCache  # pylint: disable=wrong-import-position
+
+
+def _resident_mb(pid):
+    """Returns the resident memory of a process and its children (in MB), or 0 if it has exited."""
+    page_size = os.sysconf('SC_PAGE_SIZE')
+
+    try:
+        with open(f'/proc/{pid}/statm', 'r', encoding='utf-8') as file:
+            resident = int(file.read().split()[1]) * page_size
+
+        with open(f'/proc/{pid}/task/{pid}/children', 'r', encoding='utf-8') as file:
+            children = [int(child) for child in file.read().split()]
+    except (OSError, ValueError, IndexError):
+        return 0
+
+    return resident / 1024 / 1024 + sum(_resident_mb(child) for child in children)
+
+def _sample_memory(samples, interval, stop):
+    """Records the resident memory of this process (and its workers) at each interval until stopped."""
+    start = monotonic()
+
+    while not stop.wait(interval):
+        samples.append((monotonic() - start, _resident_mb(os.getpid())))
+
+def prepare_corpus(corpus, count, workers):
+    """Returns the first count PDFs of the corpus, generating them with synthetic.py if there are too few."""
+    pdf_files = sorted(corpus.glob('*.pdf'))[:count]
+
+    if len(pdf_files) < count:
+        print(f'Generating {count} synthetic paycheques in {corpus}')
+
+        subprocess.run(
+            [
+                sys.executable, str(Path(__file__).with_name('synthetic.py')), str(corpus),
+                '--count', str(count), '--workers', str(workers),
+            ],
+            check=True,
+        )
+        pdf_files = sorted(corpus.glob('*.pdf'))[:count]
+
+    return pdf_files
+
+def _link_or_copy(pdf_file, path):
+    """Hard links a PDF into a directory (copying it if links are not supported)."""
+    target = Path(path, pdf_file.name)
+
+    try:
+        os.link(pdf_file, target)
+    except OSError:
+        shutil.copy(pdf_file, target)
+
+def run_benchmark(pdf_files, workers, interval, log):
+    """Extracts, saves and moves the PDFs in one pipeline run, sampling its resident memory.
+
+        The PDFs are linked (or copied) to a temporary directory before
+        the run, so the corpus itself is left untouched.
+
+        Returns:
+            list: tuples of the seconds into the run and the resident
+                memory (in MB) of the process and its workers.
+    """
+    samples = []
+    stop = Event()
+
+    with tempfile.TemporaryDirectory() as temp_path:
+        config = {
+            'pdf_extract_path': Path(temp_path, 'extract'),
+            'pdf_move_path': Path(temp_path, 'move'),
+            'pdf_reject_path': Path(temp_path, 'move', 'Rejected'),
+            'data_path': Path(temp_path, 'data'),
+            'log_level': log.level,
+            'save_coordinates': False,
+            'template_cache_path': None,
+            'workers': workers,
+            'queue_size': 8,
+            'outputs': {'csv'},
+            'tables': list(TABLE_SCHEMAS),
+            'watch': False,
+            'trace_memory': False,
+        }
+
+        for path in ('pdf_extract_path', 'pdf_move_path', 'data_path'):
+            config[path].mkdir()
+
+        for pdf_file in pdf_files:
+            _link_or_copy(pdf_file, config['pdf_extract_path'])
+
+        sampler = Thread(target=_sample_memory, args=(samples, interval, stop), daemon=True)
+        sampler.start()
+
+        try:
+            run_pipeline(config, log, TemplateCache(log))
+        finally:
+            stop.set()
+            sampler.join()
+
+        moved = sum(1 for _ in os.scandir(config['pdf_move_path']))
+
+    print(f'{moved} of {len(pdf_files)} files moved')
+
+    return samples
+
+def measure_growth(samples, warmup):
+    """Measures how much the resident memory grew after the warm-up.
+
+        The samples after the warm-up are split in half; memory that
+        stays flat has the same peak in both halves, while memory that
+        grows with the number of PDFs peaks higher in the second half.
+
+        Parameters:
+            samples (list): the memory samples of the run.
+            warmup (float): the fraction of the samples that are the
+                warm-up (e.g. starting workers and filling the queues).
+
+        Returns:
+            tuple: the peak memory of each half and the growth (in MB).
+    """
+    measured = [rss for _, rss in samples[int(len(samples) * warmup):]]
+    middle = len(measured) // 2
+    first_peak = max(measured[:middle])
+    second_peak = max(measured[middle:])
+
+    return first_peak, second_peak, second_peak - first_peak
+
+def main():
+    """Runs the memory check and exits with an error if the memory grew past the threshold."""
+    parser = argparse.ArgumentParser(description='Checks that memory stays flat when extracting many AHS paycheques.')
+    parser.add_argument(
+        'corpus', type=Path, help='directory of PDFs to use (synthetic PDFs are generated if there are too few)',
+    )
+    parser.add_argument('--count', type=int, default=50000, help='number of PDFs to extract (default: 50000)')
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes (default: 1)')
+    parser.add_argument(
+        '--interval', type=float, default=0.5, help='seconds between memory samples (default: 0.5)',
+    )
+    parser.add_argument(
+        '--warmup', type=float, default=0.1, help='fraction of the run ignored as warm-up (default: 0.1)',
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=20,
+        help='MB the peak memory may grow by after the warm-up before it is a failure (default: 20)',
+    )
+    options = parser.parse_args()
+
+    if not Path('/proc/self/statm').exists():
+        sys.exit('The memory check reads /proc, so it needs Linux')
+
+    log = logging.getLogger('ahs-paycheque-extraction-benchmark')
+    log.addHandler(logging.StreamHandler())
+    log.setLevel(logging.ERROR)
+
+    options.corpus.mkdir(parents=True, exist_ok=True)
+    pdf_files = prepare_corpus(options.corpus, options.count, max(options.workers, 1))
+    samples = run_benchmark(pdf_files, max(options.workers, 1), options.interval, log)
+
+    if len(samples) < 4:
+        sys.exit('Too few memory samples were taken; use more PDFs or a shorter --interval')
+
+    first_peak, second_peak, growth = measure_growth(samples, options.warmup)
+
+    print(f'{len(samples)} samples over {samples[-1][0]:.1f} s')
+    print(f'Peak memory after warm-up: {first_peak:.1f} MB (first half), {second_peak:.1f} MB (second half)')
+    print(f'Growth: {growth:+.1f} MB (threshold {options.threshold:.1f} MB)')
+
+    if growth > options.threshold:
+        print('FAILURE: memory grew with the number of PDFs')
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
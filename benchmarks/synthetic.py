@@ -0,0 +1,463 @@
+"""Generates synthetic AHS paycheque PDFs for benchmarking the extraction."""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+import random
+
+import fitz
+
+
+# Page size and font used for the paycheque layout
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+FONT_NAME = 'helv'
+FONT_SIZE = 7
+
+# Left and right margins (as drawn by the horizontal rules)
+LEFT = 20
+RIGHT = 592
+
+# Left of the TAX DATA, TAXES and EMPLOYER PAID BENEFITS sections
+RIGHT_COLUMN = 430
+
+# Labels used for the TAX DATA section by older and newer paycheques
+TAX_DATA_LABELS = {
+    'new': ['Net Claim Amount:', 'Special Letters:', 'Addl. Percent:', 'Addl. Amount:'],
+    'old': ['Net Claim Amt.:', 'Spcl. Letters:', 'Addl. Pct.:', 'Addl. Amt.:'],
+}
+
+# Descriptions used for the rows of each table
+DESCRIPTIONS = {
+    'hours_and_earnings': [
+        'Regular Salary', 'Evening Shift Premium', 'Weekend Premium', 'Overtime 1.5x', 'Stat Holiday Pay',
+        'Responsibility Allowance', 'On Call Premium',
+    ],
+    'taxes': ['Fed Withholdng', 'Fed OASDI/EE', 'Fed MED/EE', 'AB Withholdng'],
+    'before_tax_deductions': ['LAPP', 'RRSP', 'Union Dues'],
+    'after_tax_deductions': ['Life Ins', 'Parking', 'Charity'],
+    'employer_paid_benefits': ['Basic Life', 'Dental', 'Extended Health'],
+}
+
+# Tables with a variable number of rows
+ROW_TABLES = [
+    'hours_and_earnings',
+    'taxes',
+    'before_tax_deductions',
+    'after_tax_deductions',
+    'employer_paid_benefits',
+    'direct_deposit_distribution',
+]
+
+
+def _money(value):
+    """Formats a value as currency."""
+    return f'{value:,.2f}'
+
+def _random_amount(rnd, maximum):
+    """Returns a random amount with two decimal places."""
+    return rnd.randint(0, maximum * 100) / 100
+
+def _text_length(text):
+    """Returns the width of text in the paycheque font."""
+    return fitz.get_text_length(text, fontname=FONT_NAME, fontsize=FONT_SIZE)
+
+def _pdf_string(text):
+    """Encodes text as a PDF string literal."""
+    encoded = text.encode('cp1252', errors='replace')
+    escaped = ''.join(
+        f'\\{byte:03o}' if byte > 126 or chr(byte) in '()\\' else chr(byte) for byte in encoded
+    )
+
+    return f'({escaped})'
+
+
+class PaychequeCanvas:
+    """Draws the text and rules of a paycheque onto a PDF page.
+
+        The page content is written directly as PDF drawing operators,
+        which is much faster than drawing each item through PyMuPDF
+        when generating thousands of files. The text is drawn in the
+        same Helvetica font that Page.insert_text uses.
+    """
+    def text(self, x, y, text):
+        """Draws text with its baseline starting at (x, y)."""
+        self.operators.append(
+            f'BT /{FONT_NAME} {FONT_SIZE} Tf 1 0 0 1 {x:.3f} {PAGE_HEIGHT - y:.3f} Tm {_pdf_string(text)} Tj ET'
+        )
+
+    def right_text(self, right, y, text):
+        """Draws text with its baseline ending at (right, y)."""
+        self.text(right - _text_length(text), y, text)
+
+    def right_of(self, label_x, label):
+        """Returns the right edge of a label drawn at label_x."""
+        return label_x + _text_length(label)
+
+    def rule(self, y):
+        """Draws a horizontal rule across the page."""
+        self.operators.append(f'{LEFT} {PAGE_HEIGHT - y} m {RIGHT} {PAGE_HEIGHT - y} l S')
+
+    def finish(self):
+        """Writes the drawn text and rules to the page."""
+        pdf = self.page.parent
+        xref = pdf.get_new_xref()
+
+        pdf.update_object(xref, '<<>>')
+        pdf.update_stream(xref, '\n'.join(self.operators).encode('latin-1'))
+        self.page.set_contents(xref)
+
+    def __init__(self, page):
+        self.page = page
+        self.page.insert_font(fontname=FONT_NAME)
+        self.operators = []
+
+def _draw_description_table(canvas, rnd, x_positions, top, descriptions, rows):
+    """Draws a table of descriptions with current and YTD amounts.
+
+        Returns:
+            float: the baseline of the TOTAL row.
+    """
+    x_description, x_current, x_ytd = x_positions
+
+    canvas.text(x_description, top, 'Description')
+    canvas.text(x_current, top, 'Current')
+    canvas.text(x_ytd, top, 'YTD')
+
+    right_current = canvas.right_of(x_current, 'Current')
+    right_ytd = canvas.right_of(x_ytd, 'YTD')
+    total_current = 0
+    total_ytd = 0
+    y = top + 10
+
+    for index in range(rows):
+        current = _random_amount(rnd, 1000)
+        ytd = _random_amount(rnd, 10000)
+        total_current += current
+        total_ytd += ytd
+
+        canvas.text(x_description, y, descriptions[index % len(descriptions)])
+        canvas.right_text(right_current, y, _money(current))
+        canvas.right_text(right_ytd, y, _money(ytd))
+        y += 9
+
+    canvas.text(x_description, y, 'TOTAL:')
+    canvas.right_text(right_current, y, _money(total_current))
+    canvas.right_text(right_ytd, y, _money(total_ytd))
+
+    return y
+
+def _draw_hours_and_earnings(canvas, rnd, top, rows):
+    """Draws the Hours and Earnings table.
+
+        Returns:
+            float: the baseline of the TOTAL row.
+    """
+    headers = [('Description', 22), ('Rate', 150), ('Hours', 195), ('Earnings', 235), ('Hours', 290), ('Earnings', 335)]
+
+    for header, x in headers:
+        canvas.text(x, top, header)
+
+    rights = [canvas.right_of(x, header) for header, x in headers[1:]]
+    totals = [0, 0, 0, 0]
+    descriptions = DESCRIPTIONS['hours_and_earnings']
+    y = top + 10
+
+    for index in range(rows):
+        values = [
+            _random_amount(rnd, 80),
+            _random_amount(rnd, 5000),
+            _random_amount(rnd, 800),
+            _random_amount(rnd, 50000),
+        ]
+        totals = [total + value for total, value in zip(totals, values)]
+
+        canvas.text(22, y, descriptions[index % len(descriptions)])
+        canvas.right_text(rights[0], y, f'{rnd.randint(1000, 9000) / 100:.6f}')
+        canvas.right_text(rights[1], y, f'{values[0]:.2f}')
+        canvas.right_text(rights[2], y, _money(values[1]))
+        canvas.right_text(rights[3], y, f'{values[2]:.2f}')
+        canvas.right_text(rights[4], y, _money(values[3]))
+        y += 9
+
+    canvas.text(22, y, 'TOTAL:')
+    canvas.right_text(rights[1], y, f'{totals[0]:.2f}')
+    canvas.right_text(rights[2], y, _money(totals[1]))
+    canvas.right_text(rights[3], y, f'{totals[2]:.2f}')
+    canvas.right_text(rights[4], y, _money(totals[3]))
+
+    return y
+
+def generate_paycheque(path, seed=0, rows=None, old_labels=False, next_year=True, message='', begin_date=None):
+    """Generates a synthetic paycheque PDF.
+
+        Parameters:
+            path (obj): the Path to save the PDF to.
+            seed (int): the seed for the random amounts and the advice
+                number.
+            rows (dict): the number of rows for each of the ROW_TABLES
+                (defaults to a few rows each).
+            old_labels (bool): whether to use the older TAX DATA labels.
+            next_year (bool): whether to include the next year vacation.
+            message (str): the message (lines separated by newlines).
+            begin_date (obj): the pay begin date (defaults to a date
+                derived from the seed).
+    """
+    rnd = random.Random(seed)
+    rows = {key: 3 for key in ROW_TABLES} | (rows or {})
+    begin_date = begin_date or date(2020, 1, 5) + timedelta(days=14 * seed)
+
+    pdf = fitz.open()
+    page = pdf.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    canvas = PaychequeCanvas(page)
+
+    for y in (30, 140, 300, 420, 470, 560):
+        canvas.rule(y)
+
+    # Pay advice details
+    canvas.text(LEFT, 45, 'Pay Begin Date:')
+    canvas.text(90, 45, begin_date.strftime('%m/%d/%Y'))
+    canvas.text(LEFT, 55, 'Pay End Date:')
+    canvas.text(90, 55, (begin_date + timedelta(days=13)).strftime('%m/%d/%Y'))
+    canvas.text(300, 45, 'Advice #:')
+    canvas.text(340, 45, f'{123456 + seed:011d}')
+    canvas.text(300, 55, 'Advice Date:')
+    canvas.text(350, 55, (begin_date + timedelta(days=19)).strftime('%m/%d/%Y'))
+
+    # Baseline details
+    baseline_details = [
+        ('Employee ID:', f'{rnd.randint(0, 999999):06d}'),
+        ('Department:', 'Pharmacy Services'),
+        ('Location:', 'Royal Alexandra Hospital'),
+        ('Job Title:', 'Pharmacist II'),
+        ('Pay Rate:', f'${rnd.randint(3000, 9000) / 100:.6f}'),
+    ]
+
+    for index, (label, value) in enumerate(baseline_details):
+        canvas.text(LEFT, 75 + 10 * index, label)
+        canvas.text(80, 75 + 10 * index, value)
+
+    # Tax data
+    canvas.text(RIGHT_COLUMN, 75, 'TAX DATA:')
+    canvas.text(470, 75, 'Federal')
+    canvas.text(528, 75, 'Quebec')
+    canvas.text(560, 75, 'Alberta')
+
+    for index, label in enumerate(TAX_DATA_LABELS['old' if old_labels else 'new']):
+        y = 85 + 10 * index
+        canvas.text(RIGHT_COLUMN, y, label)
+        canvas.right_text(522, y, _money(_random_amount(rnd, 20000)))
+        canvas.right_text(590, y, _money(_random_amount(rnd, 20000)))
+
+    # Hours and earnings and taxes
+    canvas.text(LEFT, 150, 'HOURS AND EARNINGS')
+    canvas.text(RIGHT_COLUMN, 150, 'TAXES')
+
+    hours_bottom = _draw_hours_and_earnings(canvas, rnd, 162, rows['hours_and_earnings'])
+    taxes_bottom = _draw_description_table(
+        canvas, rnd, (432, 500, 560), 162, DESCRIPTIONS['taxes'], rows['taxes']
+    )
+
+    # Deductions and benefits
+    y = max(hours_bottom, taxes_bottom) + 20
+
+    canvas.text(LEFT, y, 'BEFORE-TAX DEDUCTIONS')
+    canvas.text(215, y, 'AFTER-TAX DEDUCTIONS')
+    canvas.text(RIGHT_COLUMN, y, 'EMPLOYER PAID BENEFITS')
+
+    y = max(
+        _draw_description_table(
+            canvas, rnd, (22, 120, 175), y + 12,
+            DESCRIPTIONS['before_tax_deductions'], rows['before_tax_deductions'],
+        ),
+        _draw_description_table(
+            canvas, rnd, (217, 315, 370), y + 12,
+            DESCRIPTIONS['after_tax_deductions'], rows['after_tax_deductions'],
+        ),
+        _draw_description_table(
+            canvas, rnd, (432, 500, 560), y + 12,
+            DESCRIPTIONS['employer_paid_benefits'], rows['employer_paid_benefits'],
+        ),
+    ) + 20
+
+    # Gross and net pay
+    headers = [
+        ('TOTAL GROSS', 90),
+        ('CIT TAXABLE GROSS', 160),
+        ('TOTAL TAXES', 260),
+        ('TOTAL DEDUCTIONS', 340),
+        ('NET PAY', 450),
+    ]
+
+    canvas.text(LEFT, y + 10, 'Current:')
+    canvas.text(LEFT, y + 20, 'YTD:')
+
+    for header, x in headers:
+        canvas.text(x, y, header)
+        canvas.right_text(canvas.right_of(x, header), y + 10, _money(_random_amount(rnd, 10000)))
+        canvas.right_text(canvas.right_of(x, header), y + 20, _money(_random_amount(rnd, 100000)))
+
+    # Vacation, bank balances, advance outstanding and distributions
+    y += 40
+
+    canvas.text(LEFT, y, 'Vacation Accrual')
+    canvas.text(120, y, 'YTD Bank Balances')
+    canvas.text(240, y, 'Advance Outstanding')
+    canvas.text(320, y, 'DIRECT DEPOSIT DISTRIBUTION')
+    canvas.text(445, y, 'NET PAY DISTRIBUTION')
+
+    canvas.text(LEFT, y + 10, 'Current:')
+    canvas.text(60, y + 10, f'{_random_amount(rnd, 200):.2f}')
+    canvas.text(LEFT, y + 20, 'Supplemental:')
+    canvas.text(70, y + 20, f'{_random_amount(rnd, 50):.2f}')
+
+    if next_year:
+        canvas.text(LEFT, y + 30, 'Next Year:')
+        canvas.text(70, y + 30, f'{_random_amount(rnd, 50):.2f}')
+
+    for index, label in enumerate(['YTD OT Bank', 'YTD Sick Bank', 'YTD Stat Bank', 'YTD Float Bank']):
+        canvas.text(120, y + 10 + 10 * index, label)
+        canvas.text(185, y + 10 + 10 * index, f'{_random_amount(rnd, 100):.2f}')
+
+    canvas.text(240, y + 10, 'OS/Advance')
+    canvas.text(290, y + 10, '0.00')
+
+    canvas.text(322, y + 10, 'Account Type')
+    canvas.text(385, y + 10, 'Deposit Amount')
+
+    deposit_right = canvas.right_of(385, 'Deposit Amount')
+    deposit_total = 0
+    deposit_y = y + 20
+
+    for index in range(rows['direct_deposit_distribution']):
+        amount = _random_amount(rnd, 5000)
+        deposit_total += amount
+
+        canvas.text(322, deposit_y, 'Checking' if index % 2 == 0 else 'Savings')
+        canvas.right_text(deposit_right, deposit_y, _money(amount))
+        canvas.text(445, deposit_y, f'Advice #{123456 + index:08d}')
+        canvas.right_text(590, deposit_y, _money(amount))
+        deposit_y += 9
+
+    deposit_y = max(deposit_y, y + 50) + 5
+
+    canvas.right_text(deposit_right, deposit_y, _money(deposit_total))
+    canvas.text(445, deposit_y, 'TOTAL')
+    canvas.right_text(590, deposit_y, _money(deposit_total))
+
+    # Message
+    y = deposit_y + 20
+
+    canvas.text(LEFT, y, 'MESSAGE:')
+
+    for index, line in enumerate(message.split('\n')):
+        canvas.text(70, y + 10 * index, line)
+
+    canvas.finish()
+    pdf.save(path)
+    pdf.close()
+
+def combine_paycheques(paths, path):
+    """Combines single page paycheque PDFs into one PDF (one advice per page) and removes them."""
+    pdf = fitz.open()
+
+    for paycheque_path in paths:
+        with fitz.open(paycheque_path) as paycheque:
+            pdf.insert_pdf(paycheque)
+
+        paycheque_path.unlink()
+
+    pdf.save(path)
+    pdf.close()
+
+def _generate_paycheque_from_arguments(arguments):
+    """Generates a paycheque from the generate_paycheque arguments."""
+    generate_paycheque(**arguments)
+
+def _collect_paycheque_arguments(options):
+    """Yields the generate_paycheque arguments for each paycheque."""
+    rnd = random.Random(options.seed)
+
+    for index in range(options.count):
+        seed = options.seed + index
+
+        yield {
+            'path': Path(options.output, f'paycheque_{index:06d}.pdf'),
+            'seed': seed,
+            'rows': {key: rnd.randint(options.min_rows, options.max_rows) for key in ROW_TABLES},
+            'old_labels': rnd.random() < options.old_labels,
+            'next_year': rnd.random() >= 0.2,
+            'message': options.message,
+            'begin_date': options.start_date + timedelta(days=14 * index),
+        }
+
+def parse_arguments():
+    """Parses the command line arguments for the generator."""
+    parser = argparse.ArgumentParser(description='Generates synthetic AHS paycheque PDFs.')
+    parser.add_argument('output', type=Path, help='directory to save the PDFs to')
+    parser.add_argument('--count', type=int, default=100, help='number of PDFs to generate (default: 100)')
+    parser.add_argument(
+        '--min-rows', type=int, default=1, help='minimum number of rows in each table (default: 1)',
+    )
+    parser.add_argument(
+        '--max-rows', type=int, default=6, help='maximum number of rows in each table (default: 6)',
+    )
+    parser.add_argument(
+        '--old-labels',
+        type=float,
+        default=0.2,
+        help='fraction of PDFs that use the older TAX DATA labels (default: 0.2)',
+    )
+    parser.add_argument(
+        '--message',
+        default='Thank you for your service.',
+        help='message to include (use "\\n" to separate lines)',
+    )
+    parser.add_argument(
+        '--start-date',
+        type=date.fromisoformat,
+        default=date(2020, 1, 5),
+        help='pay begin date of the first PDF; each later PDF is two weeks after (default: 2020-01-05)',
+    )
+    parser.add_argument(
+        '--pages',
+        type=int,
+        default=1,
+        help='number of paycheques to combine into each PDF, one per page (default: 1)',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random values (default: 0)')
+    parser.add_argument(
+        '--workers', type=int, default=1, help='number of processes to generate PDFs with (default: 1)',
+    )
+
+    arguments = parser.parse_args()
+    arguments.message = arguments.message.replace('\\n', '\n')
+
+    return arguments
+
+def main():
+    """Generates the requested number of synthetic paycheques."""
+    options = parse_arguments()
+    options.output.mkdir(parents=True, exist_ok=True)
+
+    paycheques = list(_collect_paycheque_arguments(options))
+
+    if options.workers > 1:
+        with ProcessPoolExecutor(max_workers=options.workers) as executor:
+            for _ in executor.map(_generate_paycheque_from_arguments, paycheques, chunksize=64):
+                pass
+    else:
+        for arguments in paycheques:
+            _generate_paycheque_from_arguments(arguments)
+
+    # Only the paycheques generated now are combined (not any left in the directory by earlier runs)
+    if options.pages > 1:
+        paths = [arguments['path'] for arguments in paycheques]
+
+        for index in range(0, len(paths), options.pages):
+            combine_paycheques(paths[index:index + options.pages], Path(options.output, f'paycheques_{index:06d}.pdf'))
+
+    print(f'Generated {options.count} paycheques in {options.output}')
+
+if __name__ == '__main__':
+    main()
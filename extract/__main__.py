@@ -1,37 +1,84 @@
 """Extracts details from AHS paycheque PDF."""
-import os
-from pathlib import Path
-import shutil
+import tracemalloc
 
-from utils import extract_data, generate_config, setup_logging, save_data, move_pdf
+from utils import (
+    generate_config, parse_arguments, setup_logging, run_pipeline, ExcelWriter, ExtractionDaemon, JobJournal, Profiler,
+    ResultCache, SQLiteWriter, TemplateCache,
+)
 
 
 def main():
     """Main function to run application."""
     # Setup Config and Logging details
-    config = generate_config()
+    config = generate_config(parse_arguments())
     log = setup_logging(config)
 
-    # Iterate through each file in the folder
-    log.info('Collecting files for extraction')
-    pdf_files = [
-        Path(config['pdf_extract_path'], file) for file in os.listdir(config['pdf_extract_path']) if file.endswith('.pdf')
-    ]
+    # Setup the cache of page layout templates
+    template_cache = TemplateCache(log, config['template_cache_path'])
 
-    for file in pdf_files:
-        log.info(f'Extracting data from {file}')
+    # Serve extraction requests instead of extracting the PDFs in the extract path (if requested)
+    if config['serve']:
+        ExtractionDaemon(config, log, template_cache).serve()
+        template_cache.save()
+        return
 
-        # Extract Data from selected PDF
-        data = extract_data(file, config, log)
+    # Setup the cache of previously extracted data (if configured)
+    result_cache = None
 
-        # Save PDF data
-        save_data(data.data, config, log)
+    if config['result_cache_path']:
+        result_cache = ResultCache(log, config['result_cache_path'], config['tables'])
 
-    # Move PDF to the configured path
-    log.info('Moving files to configured directory')
+    # Setup the journal used to resume an interrupted run (if configured)
+    journal = None
 
-    for file in pdf_files:
-        move_pdf(file, config, log)
+    if config['journal_path']:
+        journal = JobJournal(log, config['journal_path'])
+
+    # Setup any additional outputs for the extracted data
+    writers = []
+
+    if 'sqlite' in config['outputs']:
+        writers.append(SQLiteWriter(log, config['sqlite_path'], config['tables']))
+
+    if 'excel' in config['outputs']:
+        writers.append(ExcelWriter(log, config['excel_path'], config['tables']))
+
+    # Trace the memory allocated in each stage (if requested)
+    if config['trace_memory']:
+        tracemalloc.start()
+
+    # Profile the run (if requested)
+    profiler = None
+
+    if config['profile']:
+        profiler = Profiler(log, config['profile'], config['profile_output_path'], config['profile_interval'])
+        profiler.start()
+
+    # Discover, read, extract, save and move each PDF
+    try:
+        run_metrics = run_pipeline(config, log, template_cache, result_cache, writers, journal)
+    finally:
+        for writer in writers:
+            writer.close()
+
+        if journal:
+            journal.close()
+
+        if profiler:
+            profiler.stop()
+
+    # Summarize the time spent in each stage of the run
+    log.info(f'Run summary:\n{run_metrics.summary()}')
+
+    if config['metrics_report_path']:
+        log.info(f'Saving metrics report to {config["metrics_report_path"]}')
+        run_metrics.save(config['metrics_report_path'])
+
+    # Save the caches for future runs
+    template_cache.save()
+
+    if result_cache:
+        result_cache.save()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,108 @@
+"""Sends PDFs to the extraction daemon (python extract --serve) and prints the extracted data.
+
+    Only the standard library (and python-dotenv, to read the same
+    config.env as the daemon) is imported, so the client starts quickly
+    and the extraction itself runs in the already warm daemon. The port
+    and token file default to DAEMON_PORT and DAEMON_TOKEN_PATH (from the
+    environment or config.env), as the daemon's do.
+"""
+import argparse
+from http.client import HTTPConnection
+import json
+import os
+from pathlib import Path
+import sys
+
+from dotenv import dotenv_values, find_dotenv
+
+
+def parse_arguments():
+    """Parses the command line arguments for the client."""
+    # Environment variables take precedence over config.env, as they do for the daemon
+    settings = {**dotenv_values(find_dotenv(filename='config.env')), **os.environ}
+
+    parser = argparse.ArgumentParser(description='Extracts AHS paycheque PDFs with a running extraction daemon.')
+    parser.add_argument('files', nargs='+', type=Path, help='PDFs to extract')
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(settings.get('DAEMON_PORT') or '8765'),
+        help='local port the daemon listens on (default: DAEMON_PORT or 8765)',
+    )
+    parser.add_argument(
+        '--token-file',
+        type=Path,
+        default=Path(settings['DAEMON_TOKEN_PATH']) if settings.get('DAEMON_TOKEN_PATH') else None,
+        help='file the daemon writes its token to (default: DAEMON_TOKEN_PATH or one for the port in '
+        '~/.ahs-paycheque-extraction)',
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=300,
+        help='seconds to wait for each PDF to be extracted (default: 300)',
+    )
+
+    arguments = parser.parse_args()
+
+    if arguments.token_file is None:
+        arguments.token_file = Path.home() / '.ahs-paycheque-extraction' / f'daemon-{arguments.port}.token'
+
+    return arguments
+
+def request_extraction(file, port, token, timeout):
+    """Requests the extraction of a PDF from the daemon.
+
+        Parameters:
+            file (obj): the Path of the PDF.
+            port (int): the local port the daemon listens on.
+            token (str): the token the daemon wrote to its token file.
+            timeout (float): seconds to wait for the response.
+
+        Returns:
+            tuple: whether the PDF was extracted and the JSON response.
+    """
+    connection = HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+    try:
+        connection.request(
+            'POST',
+            '/extract',
+            body=json.dumps({'path': str(file.resolve())}),
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'},
+        )
+        response = connection.getresponse()
+        content = response.read()
+    finally:
+        connection.close()
+
+    try:
+        return response.status == 200, json.loads(content)
+    except ValueError:
+        return False, {'file': str(file), 'error': f'{response.status} {response.reason}'}
+
+def main():
+    """Extracts each PDF and prints its JSON result on its own line."""
+    options = parse_arguments()
+    extracted = True
+
+    try:
+        token = json.loads(options.token_file.read_text(encoding='utf-8'))['token']
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        sys.exit(f'Unable to read the extraction daemon token from {options.token_file} (is the daemon running?): {e}')
+
+    for file in options.files:
+        try:
+            success, result = request_extraction(file, options.port, token, options.timeout)
+        except OSError as e:
+            sys.exit(f'Unable to connect to the extraction daemon on port {options.port}: {e}')
+
+        extracted = extracted and success
+
+        print(json.dumps(result))
+
+    if not extracted:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,15 @@
 """Initialization details for utility module."""
+from .daemon import ExtractionDaemon
+from .database import SQLiteWriter
+from .excel import ExcelWriter
 from .extraction import extract_data
+from .journal import JobJournal
+from .metrics import Metrics, RunMetrics
+from .parallel import extract_files
+from .pipeline import run_pipeline
+from .profiling import Profiler
+from .results import ResultCache
 from .saving import save_data
-from .utils import generate_config, setup_logging, move_pdf
+from .templates import TemplateCache
+from .utils import generate_config, parse_arguments, setup_logging, move_pdf
 
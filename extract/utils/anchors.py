@@ -0,0 +1,280 @@
+"""Indexes the words on a PDF page to locate text anchors."""
+from bisect import bisect_right
+
+import fitz
+
+from .templates import LAYOUT_LABELS
+
+# The searches that may use the layout template: the labels whose positions
+# make up the layout fingerprint, so they are the same on every page of it
+TEMPLATE_NEEDLES = {' '.join(label.split()).lower() for label in LAYOUT_LABELS}
+
+
+class AnchorIndex:
+    """Holds the words of a page to search for text anchors.
+
+        The page characters are read once (from the raw text, with the
+        box of each character) and every search is resolved against the
+        words they form, rather than having PyMuPDF rescan the page for
+        each anchor. Searches follow the behaviour of ``page.search_for``:
+        they are case-insensitive, match substrings and multi-word labels
+        within a line, and return the matches in the order the text
+        appears on the page. Matches that start or end within a word take
+        their edges from the characters themselves, so they do not depend
+        on the page font, and a clip keeps the characters whose glyph box
+        overlaps it, as the text page of ``page.search_for`` does.
+    """
+    def _collect_lines(self, page):
+        """Collects the characters of each text line on the page and the words they form.
+
+            Each character holds its left and right edges, its top and
+            bottom (from the font ascender and descender, as in the
+            boxes ``page.search_for`` and ``page.get_textbox`` use), its
+            text and the top and bottom of its glyph (used to test
+            whether it is within a clip).
+
+            Returns:
+                list: the characters of each line, its words and the
+                    range of its glyphs.
+        """
+        textpage = page.get_textpage(flags=fitz.TEXTFLAGS_WORDS | fitz.TEXT_ACCURATE_BBOXES)
+        lines = []
+
+        for block in textpage.extractRAWDICT()['blocks']:
+            if block['type'] != 0:  # Only text blocks hold characters
+                continue
+
+            for line in block['lines']:
+                chars = []
+                words = []
+                word_start = 0
+                glyph_top = float('inf')
+                glyph_bottom = float('-inf')
+
+                for span in line['spans']:
+                    ascent = span['ascender'] * span['size']
+                    descent = span['descender'] * span['size']
+
+                    for char in span['chars']:
+                        text = char['c']
+                        x0, y0, x1, y1 = char['bbox']
+                        baseline = char['origin'][1]
+
+                        if text.isspace():
+                            if word_start < len(chars):
+                                words.append(self._make_word(chars[word_start:]))
+
+                            word_start = len(chars) + 1
+                        else:
+                            glyph_top = min(glyph_top, y0)
+                            glyph_bottom = max(glyph_bottom, y1)
+
+                        chars.append((x0, baseline - ascent, x1, baseline - descent, text, y0, y1))
+
+                if word_start < len(chars):
+                    words.append(self._make_word(chars[word_start:]))
+
+                if chars:
+                    lines.append((chars, words, (glyph_top, glyph_bottom)))
+
+        return lines
+
+    def _make_word(self, chars):
+        """Makes a word (its box, text and characters) from a run of characters."""
+        return (
+            chars[0][0],
+            min(char[1] for char in chars),
+            chars[-1][2],
+            max(char[3] for char in chars),
+            ''.join(char[4] for char in chars),
+            chars,
+        )
+
+    def _index_line(self, words):
+        """Joins a line of words and records where each word starts."""
+        starts = []
+        position = 0
+
+        for word in words:
+            starts.append(position)
+            position += len(word[4]) + 1
+
+        text = ' '.join(word[4] for word in words).lower()
+
+        return words, starts, text
+
+    def _char_in_clip(self, char, clip):
+        """Confirms whether the glyph box of a character overlaps the clip."""
+        return char[0] < clip.x1 and char[2] > clip.x0 and char[5] < clip.y1 and char[6] > clip.y0
+
+    def _clip_word(self, word, clip, is_within_height):
+        """Returns the part of a word within the clip (or None if none of it is).
+
+            Words entirely within the clip (or entirely to one side of it)
+            are resolved without testing each character.
+        """
+        if word[2] <= clip.x0 or word[0] >= clip.x1:
+            return None
+
+        if is_within_height and word[0] > clip.x0 and word[2] < clip.x1:
+            return word
+
+        chars = [char for char in word[5] if self._char_in_clip(char, clip)]
+
+        if len(chars) == len(word[5]):
+            return word
+
+        return self._make_word(chars) if chars else None
+
+    def _match_chars(self, words, starts, start, end):
+        """Returns the characters of the words of a line between two offsets in its text."""
+        first = bisect_right(starts, start) - 1
+        last = bisect_right(starts, end - 1) - 1
+
+        if first == last:
+            return words[first][5][start - starts[first]:end - starts[first]]
+
+        return [
+            *words[first][5][start - starts[first]:],
+            *(char for word in words[first + 1:last] for char in word[5]),
+            *words[last][5][:end - starts[last]],
+        ]
+
+    def _search_line(self, line, needle):
+        """Returns a list of Rect objects for each occurrence in a line."""
+        words, starts, text = line
+        instances = []
+
+        start = text.find(needle)
+
+        while start != -1:
+            end = start + len(needle)
+
+            # The match covers the boxes of its characters (including any that are part of a word)
+            chars = self._match_chars(words, starts, start, end)
+
+            instances.append(fitz.Rect(
+                chars[0][0],
+                min(char[1] for char in chars),
+                chars[-1][2],
+                max(char[3] for char in chars),
+            ))
+
+            start = text.find(needle, end)
+
+        return instances
+
+    def search_for(self, text, clip=None, cache=True):
+        """Searches the indexed words for the provided text.
+
+            Parameters:
+                text (str): the text to search for.
+                clip (rect-like): restricts the search to the characters
+                    with their glyph inside this area.
+                cache (bool): whether the result may be read from or
+                    stored in the layout template; should be False for
+                    anchors that move between pages of the same layout.
+                    Only unclipped searches for the labels in the layout
+                    fingerprint (see LAYOUT_LABELS) use the template, as
+                    other anchors (and any clip built from them) can move
+                    with the number of rows in each table.
+
+            Returns:
+                list: a list of PyMuPDF Rect objects, one per match.
+        """
+        needle = ' '.join(text.split()).lower()
+
+        if self.metrics is not None:
+            self.metrics.count('anchor_searches')
+
+        # Rects are only read, so one passed in is used as it is
+        if clip is not None and not isinstance(clip, fitz.Rect):
+            clip = fitz.Rect(clip)
+
+        if self.template is None or not cache or clip is not None or needle not in TEMPLATE_NEEDLES:
+            return self._search(needle, clip)
+
+        # Keyed as in templates saved by earlier runs (which also held clipped searches)
+        key = f'{needle}|None'
+
+        if key not in self.template:
+            self.template[key] = [list(instance) for instance in self._search(needle, clip)]
+        elif self.metrics is not None:
+            self.metrics.count('anchor_template_hits')
+
+        return [fitz.Rect(instance) for instance in self.template[key]]
+
+    def _search_clipped_line(self, line, line_span, needle, clip):
+        """Searches the words of a line within the clip for the needle."""
+        if clip is not None:
+            # Skip lines without any glyphs in the clip's height
+            if line_span[1] <= clip.y0 or line_span[0] >= clip.y1:
+                return []
+
+            words = []
+            is_clipped = False
+            is_within_height = clip.y0 < line_span[0] and line_span[1] < clip.y1
+
+            for word in line[0]:
+                clipped_word = self._clip_word(word, clip, is_within_height)
+                is_clipped = is_clipped or clipped_word is not word
+
+                if clipped_word is not None:
+                    words.append(clipped_word)
+
+            if not words:
+                return []
+
+            # Only need to re-index the line if the clip removed any characters
+            if is_clipped:
+                line = self._index_line(words)
+
+        return self._search_line(line, needle)
+
+    def _search(self, needle, clip):
+        """Searches the lines of the page for the needle."""
+        instances = []
+
+        for line, line_span in zip(self.lines, self.line_spans):
+            instances.extend(self._search_clipped_line(line, line_span, needle, clip))
+
+        return instances
+
+    def search_areas(self, searches):
+        """Searches for several texts, each within its own area, in one pass.
+
+            The results match calling search_for (without the layout
+            template) for each search, but the lines of the page are
+            only walked once.
+
+            Parameters:
+                searches (list): a list of (text, clip) tuples.
+
+            Returns:
+                list: a list of PyMuPDF Rect objects for each search.
+        """
+        searches = [(' '.join(text.split()).lower(), fitz.Rect(clip)) for text, clip in searches]
+        results = [[] for _ in searches]
+
+        if self.metrics is not None:
+            self.metrics.count('anchor_searches', len(searches))
+
+        for line, line_span in zip(self.lines, self.line_spans):
+            for index, (needle, clip) in enumerate(searches):
+                results[index].extend(self._search_clipped_line(line, line_span, needle, clip))
+
+        return results
+
+    def __init__(self, page, template=None, metrics=None):
+        self.template = template
+        self.metrics = metrics
+
+        # The characters and words of each line (in the page text order) and the range of its glyphs
+        lines = self._collect_lines(page)
+
+        self.char_lines = [chars for chars, _, _ in lines]
+        self.lines = [self._index_line(words) for _, words, _ in lines]
+        self.line_spans = [line_span for _, _, line_span in lines]
+
+        # The lowest point of any text on the page
+        self.text_bottom = max((word[3] for _, words, _ in lines for word in words), default=0)
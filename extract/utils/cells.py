@@ -0,0 +1,121 @@
+"""Extracts the text for a batch of page areas in a single pass."""
+from bisect import bisect_right
+
+
+class CellExtractor:
+    """Assigns the characters of a page to extraction cells.
+
+        The page characters are read once (or taken from the AnchorIndex
+        of the page) and swept against all of the cells sorted by their
+        vertical position, so each cell's text is assembled without
+        another pass over the page. Characters are matched with the same
+        rules as ``page.get_textbox``: any character whose box overlaps
+        the cell is included, characters are kept in page text order and
+        each text line is separated by a newline.
+    """
+    def _read_chars(self, page):
+        """Reads the characters of each text line on the page."""
+        textpage = page.get_textpage()
+        char_lines = []
+
+        for block in textpage.extractRAWDICT()['blocks']:
+            if block['type'] != 0:  # Only text blocks hold characters
+                continue
+
+            for line in block['lines']:
+                chars = [
+                    (*char['bbox'], char['c']) for span in line['spans'] for char in span['chars']
+                ]
+
+                if chars:
+                    char_lines.append(chars)
+
+        return char_lines
+
+    def _collect_lines(self, char_lines):
+        """Collects the characters of each text line, with the extent of the line."""
+        lines = []
+
+        for chars in char_lines:
+            # Left-to-right lines can be searched by x position
+            is_sorted = all(
+                chars[i][0] <= chars[i + 1][0] and chars[i][2] <= chars[i + 1][2]
+                for i in range(len(chars) - 1)
+            )
+
+            lines.append({
+                'order': len(lines),
+                'top': min(char[1] for char in chars),
+                'bottom': max(char[3] for char in chars),
+                'chars': chars,
+                'rights': [char[2] for char in chars] if is_sorted else None,
+            })
+
+        return lines
+
+    def _match_line(self, line, rect):
+        """Returns the characters of a line that overlap the rect."""
+        chars = line['chars']
+        start = 0
+        is_searchable = line['rights'] is not None and rect[0] <= rect[2]
+
+        # Skip any characters that finish left of the rect
+        if is_searchable:
+            start = bisect_right(line['rights'], rect[0])
+
+        text = []
+
+        for char in chars[start:]:
+            # Stop at the first character that starts right of the rect
+            if is_searchable and char[0] >= rect[2]:
+                break
+
+            if not (
+                rect[0] >= char[2]
+                or rect[1] >= char[3]
+                or rect[2] <= char[0]
+                or rect[3] <= char[1]
+            ):
+                text.append(char[4])
+
+        return ''.join(text)
+
+    def extract(self, rects):
+        """Extracts the text contained in each of the provided rects.
+
+            Parameters:
+                rects (list): a list of PyMuPDF Rect objects (or rect-like
+                    sequences of x0, y0, x1, y1).
+
+            Returns:
+                list: the extracted text for each rect, in the same order.
+        """
+        rects = [tuple(rect) for rect in rects]
+        fragments = [[] for _ in rects]
+
+        # Sweep down the page, activating cells as the lines reach them
+        cell_order = sorted(range(len(rects)), key=lambda index: rects[index][1])
+        line_order = sorted(self.lines, key=lambda line: line['top'])
+
+        active = []
+        next_cell = 0
+
+        for line in line_order:
+            while next_cell < len(cell_order) and rects[cell_order[next_cell]][1] < line['bottom']:
+                active.append(cell_order[next_cell])
+                next_cell += 1
+
+            # Cells ending above this line cannot overlap any later lines
+            active = [index for index in active if rects[index][3] > line['top']]
+
+            for index in active:
+                text = self._match_line(line, rects[index])
+
+                if text:
+                    fragments[index].append((line['order'], text))
+
+        return ['\n'.join(text for _, text in sorted(cell)) for cell in fragments]
+
+    def __init__(self, page, char_lines=None):
+        # The characters may already have been read (e.g. by the AnchorIndex of the page)
+        self.lines = self._collect_lines(self._read_chars(page) if char_lines is None else char_lines)
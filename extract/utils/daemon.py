@@ -0,0 +1,243 @@
+"""Serves extraction requests from a long-running process over local HTTP."""
+from contextlib import nullcontext
+import hmac
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+from pathlib import Path
+import secrets
+import signal
+from threading import Lock
+from time import perf_counter
+
+from .parallel import extract_files, start_workers
+from .preflight import check_pdf
+from .results import serialize_data
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests to an ExtractionDaemon.
+
+        GET /health reports that the daemon is ready. POST /extract
+        extracts the PDF at the "path" in the JSON request body and
+        responds with the JSON data of each page (as saved in the result
+        cache) and the metrics of its extraction. Every request must have
+        the daemon's token as a bearer token in its Authorization header.
+    """
+    def _send_json(self, status, body):
+        """Sends a JSON response."""
+        content = json.dumps(body).encode('utf-8')
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _read_path(self):
+        """Reads the path of the PDF to extract from the request body (or None if it is invalid)."""
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            path = json.loads(self.rfile.read(length))['path']
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        return Path(path) if isinstance(path, str) else None
+
+    def _is_authorized(self):
+        """Checks the request has the daemon's token, responding with an error if it does not."""
+        authorization = self.headers.get('Authorization', '').encode('utf-8', 'replace')
+        expected = f'Bearer {self.server.extraction_daemon.token}'.encode('utf-8')
+
+        if hmac.compare_digest(authorization, expected):
+            return True
+
+        self._send_json(401, {'error': 'The request must have the token in the daemon token file'})
+
+        return False
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Responds to a health check."""
+        if not self._is_authorized():
+            return
+
+        if self.path != '/health':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        self._send_json(200, {'status': 'ok', 'workers': self.server.extraction_daemon.config['workers']})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Extracts the requested PDF and responds with its data."""
+        if not self._is_authorized():
+            return
+
+        if self.path != '/extract':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        file = self._read_path()
+
+        if file is None:
+            self._send_json(400, {'error': 'The request body must be JSON with the "path" of a PDF'})
+            return
+
+        try:
+            status, body = self.server.extraction_daemon.extract(file)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.server.extraction_daemon.log.error(f'  Unable to extract data from {file}: {e}')
+            status, body = 500, {'file': str(file), 'error': str(e)}
+
+        self._send_json(status, body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Logs each request through the app logger (rather than to stderr)."""
+        self.server.extraction_daemon.log.debug(f'  {self.address_string()} - {format % args}')
+
+
+class ExtractionDaemon:
+    """Keeps the extraction warm in a long-running process.
+
+        Python, PyMuPDF, the configuration and the layout templates are
+        only loaded once, and (when more than one worker is configured)
+        the worker processes are started before the first request (and
+        started again if one dies), so each request only costs the
+        extraction itself. Requests are served over HTTP on the local
+        machine only, and only from clients that can read the token the
+        daemon writes to its token file (which only its owner can read),
+        as the daemon reads any PDF it is sent with its owner's
+        permissions. The PDFs are only extracted; they are not saved or
+        moved.
+    """
+    def _running_daemon(self):
+        """Returns the process ID of another running daemon using the token file (or None if there is none)."""
+        try:
+            pid = json.loads(self.token_path.read_text(encoding='utf-8'))['pid']
+            os.kill(pid, 0)
+        except PermissionError:
+            # The process exists but belongs to another user
+            pass
+        except (OSError, ValueError, KeyError, TypeError):
+            # No token file, one left by a daemon that has stopped, or one that cannot be read
+            return None
+
+        return pid if pid != os.getpid() else None
+
+    def _write_token(self):
+        """Writes the token to a new token file that only the owner can read (or write).
+
+            The file holds the token and the process ID of this daemon,
+            so a daemon will not start while another running daemon uses
+            the same file (which would replace its token).
+        """
+        pid = self._running_daemon()
+
+        if pid is not None:
+            raise FileExistsError(
+                f'Another extraction daemon (process {pid}) is using the token file {self.token_path}'
+            )
+
+        self.token_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.token_path.unlink(missing_ok=True)
+
+        # Created exclusively, so the file cannot already exist with other permissions (or as a link)
+        descriptor = os.open(self.token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            json.dump({'pid': os.getpid(), 'token': self.token}, file)
+
+        self.token_written = True
+
+    def extract(self, file):
+        """Extracts the data from each page of a PDF.
+
+            Returns:
+                tuple: the HTTP status and the JSON body of the response.
+        """
+        start = perf_counter()
+
+        self.log.info(f'Extraction requested for {file}')
+
+        try:
+            contents = file.read_bytes()
+        except OSError as e:
+            return 404, {'file': str(file), 'error': f'Unable to read PDF: {e}'}
+
+        # PyMuPDF can only be used from one thread at a time in this process
+        with self.lock:
+            page_count, reason = check_pdf(contents)
+
+        if reason is not None:
+            return 422, {'file': str(file), 'error': reason}
+
+        pdf_files = [(file, contents, page_count, range(page_count))]
+        pages = []
+
+        # The extraction only runs in this process without workers
+        with self.lock if self.pool is None else nullcontext():
+            for _, page_number, _, data, metrics in extract_files(
+                pdf_files, self.config, self.log, self.template_cache, self.pool
+            ):
+                pages.append({
+                    'page': page_number + 1,
+                    'data': serialize_data(data) if data is not None else None,
+                    'metrics': metrics.as_dict() if metrics is not None else None,
+                })
+
+        body = {'file': str(file), 'pages': pages, 'total_ms': (perf_counter() - start) * 1000}
+
+        if any(page['data'] is None for page in pages):
+            return 500, {**body, 'error': 'Unable to extract data from every page'}
+
+        return 200, body
+
+    def serve(self):
+        """Serves requests until interrupted (or terminated)."""
+        self.log.info(f'Serving extraction requests on http://{self.host}:{self.port}')
+        self.log.info(f'Clients must send the token in {self.token_path}')
+
+        # Stop in the same way on a termination (e.g. from a service manager) as an interrupt
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            self.log.info('Stopping the extraction daemon')
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the server and any worker processes and removes the token file."""
+        self.server.server_close()
+
+        if self.token_written:
+            self.token_path.unlink(missing_ok=True)
+
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    def __init__(self, config, log, template_cache, host='127.0.0.1'):
+        self.config = config
+        self.log = log
+        self.template_cache = template_cache
+        self.host = host
+        self.port = config['daemon_port']
+        self.token_path = config['daemon_token_path']
+        self.token = secrets.token_urlsafe(32)
+        self.token_written = False
+        self.lock = Lock()
+        self.pool = None
+
+        if config['workers'] > 1:
+            self.log.info(f'Starting {config["workers"]} workers')
+            self.pool = start_workers(config)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), ExtractionRequestHandler)
+        self.server.extraction_daemon = self
+
+        # Only written once the port is bound, so a daemon that fails to start keeps another's token
+        try:
+            self._write_token()
+        except BaseException:
+            self.close()
+            raise
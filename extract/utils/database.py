@@ -0,0 +1,110 @@
+"""Saves extracted data to a SQLite database."""
+from datetime import date
+import re
+import sqlite3
+
+from .saving import DATA_MAP, collect_rows
+
+
+def _column_name(header):
+    """Converts a table header into a SQL column name."""
+    return re.sub(r'[^a-z0-9]+', '_', header.lower()).strip('_')
+
+def _column_value(value):
+    """Converts an extracted value into the same text saved to the CSVs."""
+    if value is None:
+        return None
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    return str(value)
+
+
+class SQLiteWriter:
+    """Saves the extracted data from each paycheque to a SQLite database.
+
+        Each selected DATA_MAP entry is saved to its own table. Rows are
+        buffered and inserted in batches within a transaction that is
+        committed when the writer is committed (before the saved PDFs are
+        moved) or closed. Any rows already saved for a paycheque's advice
+        number are replaced.
+    """
+    # The data is kept each time the writer is committed
+    commits_on_close = False
+
+    def _create_tables(self):
+        """Creates the tables and indexes (if they do not exist)."""
+        for key, item in DATA_MAP.items():
+            columns = ', '.join(f'{_column_name(header)} TEXT' for header in item['headers'])
+
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS {key} ({columns})')
+            self.connection.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{key}_advice_number ON {key} (advice_number)'
+            )
+            self.connection.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_{key}_pay_dates ON {key} (pay_begin_date, pay_end_date)'
+            )
+
+    def flush(self):
+        """Inserts the buffered rows into the database."""
+        if not self.advice_numbers:
+            return
+
+        self.log.info(f'  Saving {len(self.advice_numbers)} paycheque(s) to {self.path}')
+
+        advice_numbers = [(advice_number,) for advice_number in self.advice_numbers]
+
+        for key in self.tables:
+            placeholders = ', '.join('?' for _ in DATA_MAP[key]['headers'])
+
+            self.connection.executemany(f'DELETE FROM {key} WHERE advice_number = ?', advice_numbers)
+            self.connection.executemany(f'INSERT INTO {key} VALUES ({placeholders})', self.rows[key])
+
+            self.rows[key] = []
+
+        self.advice_numbers = set()
+
+    def write(self, data):
+        """Buffers the extracted data from a paycheque for saving."""
+        advice_number = _column_value(data['paycheque_details'][0][2])
+
+        # Save any earlier copy of the paycheque so it is replaced in order
+        if advice_number in self.advice_numbers:
+            self.flush()
+
+        for key in self.tables:
+            self.rows[key].extend(
+                [_column_value(value) for value in row] for row in collect_rows(data, key)
+            )
+
+        self.advice_numbers.add(advice_number)
+
+        if len(self.advice_numbers) >= self.batch_size:
+            self.flush()
+
+    def commit(self):
+        """Saves any buffered rows and commits them, so they are kept if the run stops."""
+        self.flush()
+        self.connection.commit()
+        self.connection.execute('BEGIN')
+
+    def close(self):
+        """Saves any buffered rows and commits the run."""
+        self.flush()
+        self.connection.commit()
+        self.connection.close()
+
+    def __init__(self, log, path, tables, batch_size=100):
+        self.log = log
+        self.path = path
+        self.tables = tables
+        self.batch_size = batch_size
+        self.rows = {key: [] for key in tables}
+        self.advice_numbers = set()
+
+        self.log.info(f'Opening SQLite database: {self.path}')
+
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute('BEGIN')
+        self._create_tables()
@@ -0,0 +1,54 @@
+"""Saves extracted data to an Excel workbook."""
+from openpyxl import Workbook
+
+from .saving import DATA_MAP, collect_rows
+
+
+class ExcelWriter:
+    """Saves the extracted data from each paycheque to an Excel workbook.
+
+        Each selected DATA_MAP entry is saved to its own sheet. The
+        workbook is opened in write-only mode, so rows are streamed out as
+        they are appended and memory use does not grow with the number of
+        paycheques. A write-only workbook can only be saved once, so it is
+        saved when the writer is closed and the data is not kept until
+        then (see commits_on_close). An existing workbook is never
+        overwritten, so each run needs its own path (by default, one
+        named by the time the run started).
+    """
+    # The data is only kept once the writer is closed, so the saved PDFs are only moved after that
+    commits_on_close = True
+
+    def write(self, data):
+        """Appends the extracted data from a paycheque to each sheet."""
+        for key, sheet in self.sheets.items():
+            for row in collect_rows(data, key):
+                sheet.append(row)
+
+    def commit(self):
+        """Does nothing, as a write-only workbook can only be saved once (when closed)."""
+
+    def close(self):
+        """Saves the workbook (if it has not already been saved)."""
+        if self.workbook is None:
+            return
+
+        self.log.info(f'Saving Excel workbook: {self.path}')
+
+        self.workbook.save(self.path)
+        self.workbook = None
+
+    def __init__(self, log, path, tables):
+        if path.exists():
+            raise FileExistsError(f'The Excel workbook {path} already exists; set EXCEL_PATH to a new workbook')
+
+        self.log = log
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheets = {}
+
+        for key in tables:
+            sheet = self.workbook.create_sheet(DATA_MAP[key]['folder_name'])
+            sheet.append(DATA_MAP[key]['headers'])
+
+            self.sheets[key] = sheet
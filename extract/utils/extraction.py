@@ -6,25 +6,76 @@ from time import time
 
 import fitz
 
+from .anchors import AnchorIndex
+from .cells import CellExtractor
+from .layouts import LAYOUT_VERSIONS, detect_layout, resolve_labels
+from .metrics import Metrics
+from .rows import RowTable, find_rows
+from .schemas import TABLE_SCHEMAS
+from .templates import fingerprint_page
+
+# Version of the extraction logic; increment this when a change alters the
+# extracted data so that previously cached results are not reused
+EXTRACTOR_VERSION = 3
+
+# Tables with a variable number of rows; the rows of all of the selected
+# tables are found together in one pass over the page
+ROW_TABLES = (
+    'hours_and_earnings',
+    'taxes',
+    'before_tax_deductions',
+    'after_tax_deductions',
+    'employer_paid_benefits',
+    'direct_deposit_distribution',
+    'net_pay_distribution',
+)
+
 class Coordinates:
-    """Holds PDF coordinates."""
+    """Holds PDF coordinates.
+
+        Pages have a hundred or more of these, so the PyMuPDF rect is only
+        generated when it is first needed (and then reused, as search
+        areas are used for several searches).
+    """
+    __slots__ = ('left', 'top', 'right', 'bottom', '_rect')
+
     def _generate_rect(self):
         """Generates a PyMuPDF rect object."""
         return fitz.Rect(self.left, self.top, self.right, self.bottom)
 
+    @property
+    def rect(self):
+        """The coordinates as a PyMuPDF rect object."""
+        if self._rect is None:
+            self._rect = self._generate_rect()
+
+        return self._rect
+
+    @property
+    def edges(self):
+        """The coordinates as a tuple of x0, y0, x1, y1."""
+        return (self.left, self.top, self.right, self.bottom)
+
     def __init__(self, rect):
         self.left = rect[0]
         self.top = rect[1]
         self.right = rect[2]
         self.bottom = rect[3]
-        self.rect = self._generate_rect()
+        self._rect = None
 
     def __str__(self):
         """String representation of the object"""
         return f'x1 = {self.left}; y1 = {self.top}; x2 = {self.right}; y2 = {self.bottom}'
 
 class PaychequeData:
-    """Class to extract and hold PDF data."""
+    """Class to extract and hold PDF data.
+
+        Each table is only located and extracted when it is first
+        requested, so only the selected tables are parsed. Each page of
+        a PDF is a separate pay advice, so only one page is extracted.
+        The object takes ownership of the PDF, which is closed by
+        close() or when used as a context manager.
+    """
     def _parse_coordinates(self, instances, selection=None):
         """Parses Rect object and stores coordinates.
 
@@ -97,15 +148,17 @@ class PaychequeData:
 
             instance = instances[bottom_index]
 
+        self.metrics.count('anchors_found')
+
         return Coordinates(instance)
 
-    def _identify_margins(self):
-        """Identifies the page margins using the left and right-most objects."""
-        self.log.info('Identify page margins')
+    def _measure_margins(self):
+        """Measures the page margins from the left and right-most line art."""
         min_x = None
         max_x = None
 
-        drawings = self.page.get_drawings()
+        # The raw drawings skip building PyMuPDF Point and Rect objects
+        drawings = self.page.get_cdrawings()
 
         for index, drawing in enumerate(drawings):
             for item in drawing['items']:
@@ -136,21 +189,42 @@ class PaychequeData:
 
         return min_x, max_x
 
+    def _identify_margins(self):
+        """Identifies the page margins using the left and right-most objects.
+
+            The margins are kept in the layout template (if there is one),
+            so later pages with the same layout do not need their drawings
+            read.
+        """
+        self.log.info('Identify page margins')
+        template = self.anchor_index.template
+
+        if template is not None and 'margins' in template:
+            self.metrics.count('margin_template_hits')
+            return tuple(template['margins'])
+
+        margins = self._measure_margins()
+
+        if template is not None:
+            template['margins'] = list(margins)
+
+        return margins
+
     def _identify_pay_advice_coordinate(self):
         """Identifies coordinates to extract pay advice data."""
          # Identify the initial text anchors
         anchors = {}
 
-        instances = self.page.search_for('Pay Begin Date:')
+        instances = self.anchor_index.search_for(self.labels['pay_begin_date'])
         anchors['pay_begin_date'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Pay End Date:')
+        instances = self.anchor_index.search_for(self.labels['pay_end_date'])
         anchors['pay_end_date'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Advice #:')
+        instances = self.anchor_index.search_for(self.labels['advice_number'])
         anchors['advice_number'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Advice Date:')
+        instances = self.anchor_index.search_for(self.labels['advice_date'])
         anchors['advice_date'] = self._parse_coordinates(instances)
 
         # Calculate the relevant extraction coordinates
@@ -191,22 +265,22 @@ class PaychequeData:
         # Identify the initial text anchors
         anchors = {}
 
-        instances = self.page.search_for('Employee ID:')
+        instances = self.anchor_index.search_for(self.labels['employee_id'])
         anchors['employee_id'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Department:')
+        instances = self.anchor_index.search_for(self.labels['department'])
         anchors['department'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Location:')
+        instances = self.anchor_index.search_for(self.labels['location'])
         anchors['location'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Job Title:')
+        instances = self.anchor_index.search_for(self.labels['job_title'])
         anchors['job_title'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Pay Rate:')
+        instances = self.anchor_index.search_for(self.labels['pay_rate'])
         anchors['pay_rate'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TAX DATA:')
+        instances = self.anchor_index.search_for(self.labels['tax_data'])
         anchors['tax_data'] = self._parse_coordinates(instances)
 
         # Calculate the relevant extraction coordinates
@@ -253,37 +327,21 @@ class PaychequeData:
          # Identify the initial text anchors
         anchors = {}
 
-        instances = self.page.search_for('Quebec')
+        instances = self.anchor_index.search_for(self.labels['quebec'])
         anchors['quebec'] = self._parse_coordinates(instances)
 
-        # Handling for older file versions that used different labels
-        try:
-            instances = self.page.search_for('Net Claim Amount:')
-            anchors['net_claim_amount'] = self._parse_coordinates(instances)
-        except IndexError:
-            instances = self.page.search_for('Net Claim Amt.:')
-            anchors['net_claim_amount'] = self._parse_coordinates(instances)
+        # These labels differ between versions of the layout
+        instances = self.anchor_index.search_for(self.labels['net_claim_amount'])
+        anchors['net_claim_amount'] = self._parse_coordinates(instances)
 
-        try:
-            instances = self.page.search_for('Special Letters:')
-            anchors['special_letters'] = self._parse_coordinates(instances)
-        except IndexError:
-            instances = self.page.search_for('Spcl. Letters:')
-            anchors['special_letters'] = self._parse_coordinates(instances)
+        instances = self.anchor_index.search_for(self.labels['special_letters'])
+        anchors['special_letters'] = self._parse_coordinates(instances)
 
-        try:
-            instances = self.page.search_for('Addl. Percent:')
-            anchors['additional_percent'] = self._parse_coordinates(instances)
-        except IndexError:
-            instances = self.page.search_for('Addl. Pct.:')
-            anchors['additional_percent'] = self._parse_coordinates(instances)
+        instances = self.anchor_index.search_for(self.labels['additional_percent'])
+        anchors['additional_percent'] = self._parse_coordinates(instances)
 
-        try:
-            instances = self.page.search_for('Addl. Amount:')
-            anchors['additional_amount'] = self._parse_coordinates(instances)
-        except IndexError:
-            instances = self.page.search_for('Addl. Amt.:')
-            anchors['additional_amount'] = self._parse_coordinates(instances)
+        instances = self.anchor_index.search_for(self.labels['additional_amount'])
+        anchors['additional_amount'] = self._parse_coordinates(instances)
 
         # Calculate the relevant extraction coordinates
         quebec_left = anchors['quebec'].left - 5
@@ -344,17 +402,17 @@ class PaychequeData:
         return extract_coords
 
     def _identify_hours_coordinates(self):
-        """Identifies coordinates to extract hours and earnings data."""
+        """Identifies the row layout and total coordinates of hours and earnings data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('HOURS AND EARNINGS')
+        instances = self.anchor_index.search_for(self.labels['hours_and_earnings'])
         primary_anchors['hours_and_earnings'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('BEFORE-TAX DEDUCTIONS')
+        instances = self.anchor_index.search_for(self.labels['before_tax_deductions'])
         primary_anchors['before_tax_deductions'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TAX DATA:')
+        instances = self.anchor_index.search_for(self.labels['tax_data'])
         primary_anchors['tax_data'] = self._parse_coordinates(instances)
 
         # Calculate the relevant extraction coordinates
@@ -371,83 +429,43 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Description', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['description'], clip=search_area.rect)
         anchors['description'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Rate', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['rate'], clip=search_area.rect)
         anchors['rate_current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Hours', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['hours'], clip=search_area.rect)
         anchors['hours_current'] = self._parse_coordinates(instances, 'left')
 
-        instances = self.page.search_for('Earnings', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['earnings'], clip=search_area.rect)
         anchors['earnings_current'] = self._parse_coordinates(instances, 'left')
 
-        instances = self.page.search_for('Hours', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['hours'], clip=search_area.rect)
         anchors['hours_ytd'] = self._parse_coordinates(instances, 'right')
 
-        instances = self.page.search_for('Earnings', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['earnings'], clip=search_area.rect)
         anchors['earnings_ytd'] = self._parse_coordinates(instances, 'right')
 
-        instances = self.page.search_for('TOTAL:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['table_total'], clip=search_area.rect, cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        # Rows are found by the decimal point of their YTD earnings
+        row_area = Coordinates([
                 anchors['earnings_ytd'].left,
                 anchors['earnings_ytd'].bottom,
                 anchors['earnings_ytd'].right,
                 primary_anchors['before_tax_deductions'].top - 5,
             ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Pop off the last row, as this will be the "total" row
-        row_anchors.pop()
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'description': Coordinates([
-                    anchors['description'].left - 1,
-                    row.top + 2,
-                    anchors['rate_current'].left - 30,
-                    row.bottom - 2,
-                ]),
-                'rate_current': Coordinates([
-                    anchors['rate_current'].left - 20,
-                    row.top + 2,
-                    anchors['rate_current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'hours_current': Coordinates([
-                    anchors['rate_current'].right + 4,
-                    row.top + 2,
-                    anchors['hours_current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'earnings_current': Coordinates([
-                    anchors['hours_current'].right + 4,
-                    row.top + 2,
-                    anchors['earnings_current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'hours_ytd': Coordinates([
-                    anchors['earnings_current'].right + 4,
-                    row.top + 2,
-                    anchors['hours_ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'earnings_ytd': Coordinates([
-                    anchors['hours_ytd'].right + 4,
-                    row.top + 2,
-                    anchors['earnings_ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-            })
+        columns = {
+            'description': (anchors['description'].left - 1, anchors['rate_current'].left - 30),
+            'rate_current': (anchors['rate_current'].left - 20, anchors['rate_current'].right + 2),
+            'hours_current': (anchors['rate_current'].right + 4, anchors['hours_current'].right + 2),
+            'earnings_current': (anchors['hours_current'].right + 4, anchors['earnings_current'].right + 2),
+            'hours_ytd': (anchors['earnings_current'].right + 4, anchors['hours_ytd'].right + 2),
+            'earnings_ytd': (anchors['hours_ytd'].right + 4, anchors['earnings_ytd'].right + 2),
+        }
 
         total = {
             'hours_current': Coordinates([
@@ -476,20 +494,20 @@ class PaychequeData:
             ]),
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total)
 
     def _identify_taxes_coordinates(self):
-        """Identifies coordinates to extract taxes data."""
+        """Identifies the row layout and total coordinates of taxes data."""
          # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('TAXES')
+        instances = self.anchor_index.search_for(self.labels['taxes'])
         primary_anchors['taxes'] = self._parse_coordinates(instances, 'top')
 
-        instances = self.page.search_for('EMPLOYER PAID BENEFITS')
+        instances = self.anchor_index.search_for(self.labels['employer_paid_benefits'])
         primary_anchors['employer_paid_benefits'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TAX DATA:')
+        instances = self.anchor_index.search_for(self.labels['tax_data'])
         primary_anchors['tax_data'] = self._parse_coordinates(instances)
 
         # Calculate the relevant extraction coordinates
@@ -506,56 +524,31 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Description', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['description'], clip=search_area.rect)
         anchors['description'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Current', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['ytd'], clip=search_area.rect)
         anchors['ytd'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['table_total'], clip=search_area.rect, cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        # Rows are found by the decimal point of their YTD amount
+        row_area = Coordinates([
             anchors['current'].right + 4,
             anchors['ytd'].bottom,
             anchors['ytd'].right,
             primary_anchors['employer_paid_benefits'].top - 5,
         ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Pop off the last row, as this will be the "total" row
-        row_anchors.pop()
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'description': Coordinates([
-                    anchors['description'].left - 1,
-                    row.top + 2,
-                    anchors['current'].left - 30,
-                    row.bottom - 2,
-                ]),
-                'current': Coordinates([
-                    anchors['current'].left - 20,
-                    row.top + 2,
-                    anchors['current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'ytd': Coordinates([
-                    anchors['current'].right + 4,
-                    row.top + 2,
-                    anchors['ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-            })
+        columns = {
+            'description': (anchors['description'].left - 1, anchors['current'].left - 30),
+            'current': (anchors['current'].left - 20, anchors['current'].right + 2),
+            'ytd': (anchors['current'].right + 4, anchors['ytd'].right + 2),
+        }
 
         total = {
             'current': Coordinates([
@@ -572,17 +565,17 @@ class PaychequeData:
             ]),
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total)
 
     def _identify_before_tax_coordinates(self):
-        """Identifies coordinates to extract before-tax deductions data."""
+        """Identifies the row layout and total coordinates of before-tax deductions data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('BEFORE-TAX DEDUCTIONS')
+        instances = self.anchor_index.search_for(self.labels['before_tax_deductions'])
         primary_anchors['before_tax_deductions'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('CIT TAXABLE GROSS')
+        instances = self.anchor_index.search_for(self.labels['cit_taxable_gross'])
         primary_anchors['cit_taxable_gross'] = self._parse_coordinates(instances)
 
         page_left = self.left_margin
@@ -602,56 +595,31 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Description', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['description'], clip=search_area.rect)
         anchors['description'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Current', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['ytd'], clip=search_area.rect)
         anchors['ytd'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['table_total'], clip=search_area.rect, cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        # Rows are found by the decimal point of their YTD amount
+        row_area = Coordinates([
             anchors['current'].right + 4,
             anchors['ytd'].bottom,
             anchors['ytd'].right,
             primary_anchors['cit_taxable_gross'].top - 5,
         ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Pop off the last row, as this will be the "total" row
-        row_anchors.pop()
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'description': Coordinates([
-                    anchors['description'].left - 1,
-                    row.top + 2,
-                    anchors['current'].left - 30,
-                    row.bottom - 2,
-                ]),
-                'current': Coordinates([
-                    anchors['current'].left - 20,
-                    row.top + 2,
-                    anchors['current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'ytd': Coordinates([
-                    anchors['current'].right + 4,
-                    row.top + 2,
-                    anchors['ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-            })
+        columns = {
+            'description': (anchors['description'].left - 1, anchors['current'].left - 30),
+            'current': (anchors['current'].left - 20, anchors['current'].right + 2),
+            'ytd': (anchors['current'].right + 4, anchors['ytd'].right + 2),
+        }
 
         total = {
             'description': 'Total',
@@ -669,17 +637,17 @@ class PaychequeData:
             ]),
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total)
 
     def _identify_after_tax_coordinates(self):
-        """Identifies coordinates to extract after-tax deductions data."""
+        """Identifies the row layout and total coordinates of after-tax deductions data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('AFTER-TAX DEDUCTIONS')
+        instances = self.anchor_index.search_for(self.labels['after_tax_deductions'])
         primary_anchors['after_tax_deductions'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('CIT TAXABLE GROSS')
+        instances = self.anchor_index.search_for(self.labels['cit_taxable_gross'])
         primary_anchors['cit_taxable_gross'] = self._parse_coordinates(instances)
 
         # These three columns are equally sized, so can just adjust for page
@@ -698,56 +666,31 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Description', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['description'], clip=search_area.rect)
         anchors['description'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Current', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['ytd'], clip=search_area.rect)
         anchors['ytd'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['table_total'], clip=search_area.rect, cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        # Rows are found by the decimal point of their YTD amount
+        row_area = Coordinates([
             anchors['current'].right + 4,
             anchors['ytd'].bottom,
             anchors['ytd'].right,
             primary_anchors['cit_taxable_gross'].top - 5,
         ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Pop off the last row, as this will be the "total" row
-        row_anchors.pop()
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'description': Coordinates([
-                    anchors['description'].left - 1,
-                    row.top + 2,
-                    anchors['current'].left - 30,
-                    row.bottom - 2,
-                ]),
-                'current': Coordinates([
-                    anchors['current'].left - 20,
-                    row.top + 2,
-                    anchors['current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'ytd': Coordinates([
-                    anchors['current'].right + 4,
-                    row.top + 2,
-                    anchors['ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-            })
+        columns = {
+            'description': (anchors['description'].left - 1, anchors['current'].left - 30),
+            'current': (anchors['current'].left - 20, anchors['current'].right + 2),
+            'ytd': (anchors['current'].right + 4, anchors['ytd'].right + 2),
+        }
 
         total = {
             'description': 'Total',
@@ -765,20 +708,20 @@ class PaychequeData:
             ]),
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total)
 
     def _identify_employer_benefits_coordinates(self):
-        """Identifies coordinates to extract employer-paid benefits data."""
+        """Identifies the row layout and total coordinates of employer-paid benefits data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('EMPLOYER PAID BENEFITS')
+        instances = self.anchor_index.search_for(self.labels['employer_paid_benefits'])
         primary_anchors['employer_paid_benefits'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('CIT TAXABLE GROSS')
+        instances = self.anchor_index.search_for(self.labels['cit_taxable_gross'])
         primary_anchors['cit_taxable_gross'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TAX DATA:')
+        instances = self.anchor_index.search_for(self.labels['tax_data'])
         primary_anchors['tax_data'] = self._parse_coordinates(instances)
 
         # Construct the primary search area
@@ -792,68 +735,37 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Description', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['description'], clip=search_area.rect)
         anchors['description'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Current', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['ytd'], clip=search_area.rect)
         anchors['ytd'] = self._parse_coordinates(instances)
 
+        # Some pages do not include a "TOTAL" row, but still have a
+        # "TAXABLE" label that can be used
+        instances = self.anchor_index.search_for(self.labels['table_total'], clip=search_area.rect, cache=False)
 
-        # Older versions did not include a "TOTAL" section, but  still has
-        # a "TAXABLE" label that can be used
-        try:
-            instances = self.page.search_for('TOTAL:', clip=search_area.rect)
-            anchors['total'] = self._parse_coordinates(instances, 'bottom')
-        except TypeError:
-            instances = self.page.search_for('TAXABLE', clip=search_area.rect)
-            anchors['total'] = self._parse_coordinates(instances, 'bottom')
-
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        if not instances:
+            instances = self.anchor_index.search_for(self.labels['taxable'], clip=search_area.rect, cache=False)
+
+        anchors['total'] = self._parse_coordinates(instances, 'bottom')
+
+        # Rows are found by the decimal point of their YTD amount
+        row_area = Coordinates([
             anchors['current'].right + 4,
             anchors['ytd'].bottom,
             anchors['ytd'].right,
             primary_anchors['cit_taxable_gross'].top - 5,
         ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Pop off the last row, as this will be the "total" row
-        #   In some cases with older PDFs, there is no data here, so need
-        #   to handle this case.
-        try:
-            row_anchors.pop()
-        except IndexError:
-            pass
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'description': Coordinates([
-                    anchors['description'].left - 1,
-                    row.top + 2,
-                    anchors['current'].left - 30,
-                    row.bottom - 2,
-                ]),
-                'current': Coordinates([
-                    anchors['current'].left - 20,
-                    row.top + 2,
-                    anchors['current'].right + 2,
-                    row.bottom - 2,
-                ]),
-                'ytd': Coordinates([
-                    anchors['current'].right + 4,
-                    row.top + 2,
-                    anchors['ytd'].right + 2,
-                    row.bottom - 2,
-                ]),
-            })
+        columns = {
+            'description': (anchors['description'].left - 1, anchors['current'].left - 30),
+            'current': (anchors['current'].left - 20, anchors['current'].right + 2),
+            'ytd': (anchors['current'].right + 4, anchors['ytd'].right + 2),
+        }
 
         total = {
             'current': Coordinates([
@@ -870,17 +782,17 @@ class PaychequeData:
             ]),
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total)
 
     def _identify_gross_and_net_coordinates(self):
         """Identifies coordinates to extract gross and net data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('CIT TAXABLE GROSS')
+        instances = self.anchor_index.search_for(self.labels['cit_taxable_gross'])
         primary_anchors['cit_taxable_gross'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('DIRECT DEPOSIT DISTRIBUTION')
+        instances = self.anchor_index.search_for(self.labels['direct_deposit_distribution'])
         primary_anchors['direct_deposit_distribution'] = self._parse_coordinates(instances)
 
         # Construct the primary search area
@@ -894,24 +806,24 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('TOTAL GROSS', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['total_gross'], clip=search_area.rect)
         anchors['total_gross'] = self._parse_coordinates(instances)
 
         anchors['cit_taxable_gross'] = primary_anchors['cit_taxable_gross']
 
-        instances = self.page.search_for('TOTAL TAXES', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['total_taxes'], clip=search_area.rect)
         anchors['total_taxes'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL DEDUCTIONS', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['total_deductions'], clip=search_area.rect)
         anchors['total_deductions'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('NET PAY', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['net_pay'], clip=search_area.rect)
         anchors['net_pay'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Current:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current_amounts'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['ytd_amounts'], clip=search_area.rect)
         anchors['ytd'] = self._parse_coordinates(instances)
 
         # Collect a list of coordinates for each row entry
@@ -991,13 +903,13 @@ class PaychequeData:
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('Vacation Accrual')
+        instances = self.anchor_index.search_for(self.labels['vacation_accrual'])
         primary_anchors['vacation_accrual'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD Bank Balances')
+        instances = self.anchor_index.search_for(self.labels['ytd_bank_balances'])
         primary_anchors['ytd_bank_balances'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL')
+        instances = self.anchor_index.search_for(self.labels['total'], cache=False)
         primary_anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
         # Construct the primary search area
@@ -1011,10 +923,10 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Current:', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['current_amounts'], clip=search_area.rect)
         anchors['current'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('supplemental', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['supplemental'], clip=search_area.rect)
         anchors['supplemental'] = self._parse_coordinates(instances)
 
         # Collect a list of coordinates for each row entry
@@ -1035,7 +947,7 @@ class PaychequeData:
 
         # Try to collect "Next Year" vacation if present
         try:
-            instances = self.page.search_for('Next Year:', clip=search_area.rect)
+            instances = self.anchor_index.search_for(self.labels['next_year'], clip=search_area.rect, cache=False)
             anchors['next_year'] = self._parse_coordinates(instances)
 
             extract_coords['next_year'] = Coordinates([
@@ -1054,19 +966,19 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('YTD OT Bank')
+        instances = self.anchor_index.search_for(self.labels['ytd_ot_bank'])
         anchors['ytd_ot_bank'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD Sick Bank')
+        instances = self.anchor_index.search_for(self.labels['ytd_sick_bank'])
         anchors['ytd_sick_bank'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD Stat Bank')
+        instances = self.anchor_index.search_for(self.labels['ytd_stat_bank'])
         anchors['ytd_stat_bank'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('YTD Float Bank')
+        instances = self.anchor_index.search_for(self.labels['ytd_float_bank'])
         anchors['ytd_float_bank'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Advance Outstanding')
+        instances = self.anchor_index.search_for(self.labels['advance_outstanding'])
         anchors['advance_outstanding'] = self._parse_coordinates(instances)
 
         # Collect a list of coordinates for each row entry
@@ -1104,10 +1016,10 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('OS/Advance')
+        instances = self.anchor_index.search_for(self.labels['os_advance'])
         anchors['os_advance'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('DIRECT DEPOSIT DISTRIBUTION')
+        instances = self.anchor_index.search_for(self.labels['direct_deposit_distribution'])
         anchors['direct_deposit_distribution'] = self._parse_coordinates(instances)
 
         # Collect a list of coordinates for each row entry
@@ -1123,17 +1035,17 @@ class PaychequeData:
         return {'advance_outstanding': extract_coords}
 
     def _identify_direct_deposit_coordinates(self):
-        """Identifies coordinates to extract direct deposit distribution data."""
+        """Identifies the row layout and total coordinates of direct deposit distribution data."""
         # Identify the primary anchors to refine the search area
         primary_anchors = {}
 
-        instances = self.page.search_for('DIRECT DEPOSIT DISTRIBUTION')
+        instances = self.anchor_index.search_for(self.labels['direct_deposit_distribution'])
         primary_anchors['direct_deposit_distribution'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('NET PAY DISTRIBUTION')
+        instances = self.anchor_index.search_for(self.labels['net_pay_distribution'])
         primary_anchors['net_pay_distribution'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL')
+        instances = self.anchor_index.search_for(self.labels['total'], cache=False)
         primary_anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
         # Construct the primary search area
@@ -1147,41 +1059,24 @@ class PaychequeData:
         # Identify the text anchors
         anchors = {}
 
-        instances = self.page.search_for('Account Type', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['account_type'], clip=search_area.rect)
         anchors['account_type'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('Deposit Amount', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['deposit_amount'], clip=search_area.rect)
         anchors['deposit_amount'] = self._parse_coordinates(instances)
 
-        # Identify a secondary search area for rows
-        row_search_area = Coordinates([
+        # Rows are found by the decimal point of their deposit amount
+        row_area = Coordinates([
             anchors['deposit_amount'].left,
             anchors['deposit_amount'].bottom,
             anchors['deposit_amount'].right,
             primary_anchors['total'].top - 5,
         ])
 
-        instances = self.page.search_for('.', clip=row_search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'account_type': Coordinates([
-                    anchors['account_type'].left - 1,
-                    row.top + 2,
-                    anchors['deposit_amount'].left - 4,
-                    row.bottom - 2,
-                ]),
-                'deposit_amount': Coordinates([
-                    anchors['deposit_amount'].left,
-                    row.top + 2,
-                    anchors['deposit_amount'].right,
-                    row.bottom - 2,
-                ])
-            })
+        columns = {
+            'account_type': (anchors['account_type'].left - 1, anchors['deposit_amount'].left - 4),
+            'deposit_amount': (anchors['deposit_amount'].left, anchors['deposit_amount'].right),
+        }
 
         # Add a total row
         total = {
@@ -1194,17 +1089,17 @@ class PaychequeData:
             ])
         }
 
-        return extract_coords, total
+        return RowTable(row_area.rect, columns, total, has_total_row=False)
 
     def _identify_net_pay_distribution_coordinates(self):
-        """Identifies coordinates to extract net pay distribution data."""
+        """Identifies the row layout and total coordinates of net pay distribution data."""
         # Identify the anchors to refine the search area
         anchors = {}
 
-        instances = self.page.search_for('NET PAY DISTRIBUTION')
+        instances = self.anchor_index.search_for(self.labels['net_pay_distribution'])
         anchors['net_pay_distribution'] = self._parse_coordinates(instances)
 
-        instances = self.page.search_for('TOTAL')
+        instances = self.anchor_index.search_for(self.labels['total'], cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
         # Construct the primary search area
@@ -1215,28 +1110,11 @@ class PaychequeData:
             anchors['total'].top - 5,
         ])
 
-        # Conduct second search for rows
-        instances = self.page.search_for('Advice', clip=search_area.rect)
-        row_anchors = [self._parse_coordinates([instance]) for instance in instances]
-
-        # Collect a list of coordinates for each row entry
-        extract_coords = []
-
-        for row in row_anchors:
-            extract_coords.append({
-                'advice_number': Coordinates([
-                    anchors['net_pay_distribution'].left - 1,
-                    row.top + 2,
-                    anchors['net_pay_distribution'].right + 6,
-                    row.bottom - 2,
-                ]),
-                'amount': Coordinates([
-                    anchors['net_pay_distribution'].right + 10,
-                    row.top + 2,
-                    self.right_margin,
-                    row.bottom - 2,
-                ]),
-            })
+        # Rows are found by the "Advice" label of their advice number
+        columns = {
+            'advice_number': (anchors['net_pay_distribution'].left - 1, anchors['net_pay_distribution'].right + 6),
+            'amount': (anchors['net_pay_distribution'].right + 10, self.right_margin),
+        }
 
         # Add a total row
         total = {
@@ -1249,29 +1127,18 @@ class PaychequeData:
             ])
         }
 
-        return extract_coords, total
+        return RowTable(search_area.rect, columns, total, marker=self.labels['advice'], has_total_row=False)
 
     def _identify_message_coordinates(self):
         """Identifies coordinates to extract message data."""
         # Identify the anchors to refine the search area
         anchors = {}
 
-        instances = self.page.search_for('TOTAL')
+        instances = self.anchor_index.search_for(self.labels['total'], cache=False)
         anchors['total'] = self._parse_coordinates(instances, 'bottom')
 
         # Get the lowest text on the page
-        blocks = self.page.get_text("dict")['blocks']
-
-        lowest_y = 0
-
-        # Iterate through text blocks to find the lowest (maximum y1 value) text block
-        for block in blocks:
-            if block['type'] == 0:  # Type 0 indicates text
-                bbox = block['bbox']  # Bounding box of the text block: (x0, y0, x1, y1)
-                y1 = bbox[3]  # y1 is the bottom edge of the text block
-
-                if y1 > lowest_y:
-                    lowest_y = y1
+        lowest_y = self.anchor_index.text_bottom
 
         # Construct the primary search area
         search_area = Coordinates([
@@ -1281,7 +1148,7 @@ class PaychequeData:
             lowest_y,
         ])
 
-        instances = self.page.search_for('MESSAGE', clip=search_area.rect)
+        instances = self.anchor_index.search_for(self.labels['message'], clip=search_area.rect, cache=False)
         anchors['message'] = self._parse_coordinates(instances, 'top')
 
         # Collect a list of coordinates for each row entry
@@ -1296,58 +1163,111 @@ class PaychequeData:
 
         return extract_coords
 
-    def _identify_coordinates(self):
-        """Identifies the coordinates to extract data."""
-        self.log.info('Identifying coordinates of data')
-
-        pay_advice_coords = self._identify_pay_advice_coordinate()
-        demographic_coords = self._identify_demographic_coordinates()
-        tax_data_coords = self._identify_tax_data_coordinates()
-        hours_coords, hours_total_coords = self._identify_hours_coordinates()
-        taxes_coords, taxes_total_coords = self._identify_taxes_coordinates()
-        before_tax_coords, before_tax_total_coords = self._identify_before_tax_coordinates()
-        after_tax_coords, after_tax_total_coords = self._identify_after_tax_coordinates()
-        employer_benefits_coords, employer_benefits_total_coords = self._identify_employer_benefits_coordinates()
-        gross_and_net_coords = self._identify_gross_and_net_coordinates()
-        vacation_coords = self._identify_vacation_coordinates()
-        bank_balances_coords = self._identify_bank_balances_coords()
-        advance_outstanding_coords = self._identify_advance_outstanding_coordinates()
-        direct_deposit_coords, direct_deposit_total_coords = self._identify_direct_deposit_coordinates()
-        pay_distribution_coords, pay_distribution_total_coords = self._identify_net_pay_distribution_coordinates()
-        message_coords = self._identify_message_coordinates()
-
-        return {
-            **pay_advice_coords,
-            **demographic_coords,
-            **tax_data_coords,
-            'hours_and_earnings': hours_coords,
-            'taxes': taxes_coords,
-            'before_tax_deductions': before_tax_coords,
-            'after_tax_deductions': after_tax_coords,
-            'employer_paid_benefits': employer_benefits_coords,
-            **gross_and_net_coords,
-            **vacation_coords,
-            **bank_balances_coords,
-            **advance_outstanding_coords,
-            'direct_deposit_distribution': direct_deposit_coords,
-            'net_pay_distribution': pay_distribution_coords,
-            **message_coords,
-            'totals': {
-                'hours_and_earnings': hours_total_coords,
-                'taxes': taxes_total_coords,
-                'before_tax_deductions': before_tax_total_coords,
-                'after_tax_deductions': after_tax_total_coords,
-                'employer_paid_benefits': employer_benefits_total_coords,
-                'direct_deposit_distribution': direct_deposit_total_coords,
-                'net_pay_distribution': pay_distribution_total_coords,
-            }
-        }
+    def _locate_table_rows(self, key):
+        """Identifies the layout of the row tables and finds their rows.
+
+            Along with the requested table, any other selected row tables
+            not yet located are included, so the page is only searched
+            for rows once.
+        """
+        self.log.info('Locating rows of tables')
+
+        row_tables = {}
+
+        for table_key in ROW_TABLES:
+            if table_key == key or (table_key in self.tables and table_key not in self.row_tables):
+                identify_layout, _ = self.table_methods[table_key]
+
+                with self.metrics.time(f'identify_{table_key}'):
+                    row_tables[table_key] = identify_layout()
+
+        with self.metrics.time('find_rows'):
+            self.table_rows.update(self._identify_table_rows(row_tables))
+
+        self.row_tables.update(row_tables)
+
+    def _identify_table_rows(self, row_tables):
+        """Identifies the rows of each of the row tables."""
+        table_rows = find_rows(self.anchor_index, row_tables)
+        self.metrics.count('rows_found', sum(len(rows) for rows in table_rows.values()))
+
+        return table_rows
+
+    def _identify_row_coordinates(self, key):
+        """Identifies the coordinates of each cell of a row table."""
+        row_table = self.row_tables[key]
+
+        # Each cell spans its column's edges and its row's inset edges
+        row_edges = [(top + 2, bottom - 2) for top, bottom in self.table_rows[key]]
+        column_edges = list(row_table.columns.items())
+
+        row_coordinates = [
+            {name: Coordinates((left, top, right, bottom)) for name, (left, right) in column_edges}
+            for top, bottom in row_edges
+        ]
+
+        return {key: row_coordinates, 'totals': {key: row_table.total}}
+
+    def _identify_table_coordinates(self, key):
+        """Identifies the coordinates to extract a table's data.
+
+            The text at the coordinates is extracted at the same time, so
+            each table's cells are still read from the page in one pass.
+        """
+        self.log.info(f'Identifying coordinates of {key} data')
+
+        if key in ROW_TABLES:
+            # The rows of every selected table are found on the first request
+            if key not in self.row_tables:
+                self._locate_table_rows(key)
+
+            with self.metrics.time(f'identify_{key}'):
+                coordinates = self._identify_row_coordinates(key)
+        else:
+            identify_coordinates, _ = self.table_methods[key]
+
+            with self.metrics.time(f'identify_{key}'):
+                coordinates = identify_coordinates()
+
+        with self.metrics.time('extract_cell_text'):
+            self.cell_text.update(self._extract_cell_text(coordinates))
+
+        for coordinates_key, coordinates_item in coordinates.items():
+            if coordinates_key == 'totals':
+                self.extract_coordinates['totals'].update(coordinates_item)
+            else:
+                self.extract_coordinates[coordinates_key] = coordinates_item
+
+    def _collect_coordinates(self, coords):
+        """Collects all Coordinates objects from the nested extract coordinates."""
+        if isinstance(coords, Coordinates):
+            yield coords
+        elif isinstance(coords, list):
+            for list_item in coords:
+                yield from self._collect_coordinates(list_item)
+        elif isinstance(coords, dict):
+            for _, dict_item in coords.items():
+                yield from self._collect_coordinates(dict_item)
+
+    def _extract_cell_text(self, extract_coordinates):
+        """Extracts the text for all provided coordinates in a single pass."""
+        self.log.info('Extracting text from coordinates')
+
+        # The page text is only parsed once, when it is first needed
+        if self.cell_extractor is None:
+            self.cell_extractor = CellExtractor(self.page, self.anchor_index.char_lines)
+
+        coordinates = list(self._collect_coordinates(extract_coordinates))
+        cell_text = self.cell_extractor.extract([coords.edges for coords in coordinates])
+        self.metrics.count('cells_read', len(coordinates))
+
+        return dict(zip(coordinates, cell_text))
 
     def _extract_from_pdf(self, coords, name, data_type='text'):
-        """Extracts text from provided coordinates."""
+        """Extracts and formats the value at the provided coordinates."""
         self.log.debug(f'    Extracting "{name}" ({data_type})')
 
-        value = self.page.get_textbox(coords.rect).strip()
+        value = self.cell_text[coords].strip()
 
         self.log.debug(f'    Extracted value before formatting: {value}')
 
@@ -1367,31 +1287,27 @@ class PaychequeData:
 
         self.log.debug(f'    Extracted value after formatting: {value}')
 
-        return {
-            'name': name,
-            'value': value,
-            'data_type': data_type
-        }
+        return value
 
-    def _validate_extracted_data(self, data_list, total_dict):
+    def _validate_extracted_data(self, data_list, total_list, fields):
         """Validates data list by confirming extracted data equals total."""
-        for total_index, total_value in enumerate(total_dict):
+        for total_index, extracted_total in enumerate(total_list):
             # Skip over any None values (as there is nothing to validate)
-            if total_value is None:
+            if extracted_total is None:
                 continue
 
             total = 0
-            extracted_total = total_value['value']
+            name = fields[total_index].name
 
             for item in data_list:
-                total += item[total_index]['value']
+                total += item[total_index]
 
-            if total != total_value['value']:
+            if total != extracted_total:
                 self.log.warning(
-                    f'    {total_value['name']}: Calculated total ({total}) not equal to extracted total {extracted_total}')
+                    f'    {name}: Calculated total ({total}) not equal to extracted total {extracted_total}')
             else:
                 self.log.debug(
-                    f'    {total_value['name']}: Calculated and extracted totals match ({extracted_total})'
+                    f'    {name}: Calculated and extracted totals match ({extracted_total})'
                 )
 
     def _extract_paycheque_details(self):
@@ -1399,7 +1315,7 @@ class PaychequeData:
         self.log.info('  Extracting paycheque details data')
         coords = self.extract_coordinates
 
-        extract_data = [
+        extract_data = (
             self._extract_from_pdf(
                 coords['pay_begin_date'], 'Pay Begin Date', 'date'
             ),
@@ -1412,7 +1328,7 @@ class PaychequeData:
             self._extract_from_pdf(
                 coords['advice_date'], 'Advice Date', 'date'
             ),
-        ]
+        )
 
         return [extract_data]
 
@@ -1421,7 +1337,7 @@ class PaychequeData:
         self.log.info('  Extracting baseline details data')
         coords = self.extract_coordinates
 
-        extract_data = [
+        extract_data = (
             self._extract_from_pdf(
                 coords['employee_id'], 'Employee ID'
             ),
@@ -1437,7 +1353,7 @@ class PaychequeData:
             self._extract_from_pdf(
                 coords['pay_rate'], 'Pay Rate', 'currency'
             ),
-        ]
+        )
 
         return [extract_data]
 
@@ -1446,7 +1362,7 @@ class PaychequeData:
         self.log.info('  Extracting tax data')
         coords = self.extract_coordinates
 
-        extract_data = [
+        extract_data = (
             self._extract_from_pdf(
                 coords['tax_data_federal_net_claim_amount'],
                 'Tax Data - Federal - Net Claim Amount',
@@ -1487,7 +1403,7 @@ class PaychequeData:
                 'Tax Data - alberta - Additional Amount',
                 'currency',
             ),
-        ]
+        )
 
         return [extract_data]
 
@@ -1521,14 +1437,14 @@ class PaychequeData:
                 item['earnings_ytd'], 'Earnings - YTD', 'currency'
             )
 
-            extract_data.append([
+            extract_data.append((
                 description,
                 rate_current,
                 hours_current,
                 earnings_current,
                 hours_ytd,
                 earnings_ytd,
-            ])
+            ))
 
         # Extract Total data
         total = [
@@ -1550,7 +1466,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Hours and Earnings data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['hours_and_earnings'])
 
         return extract_data
 
@@ -1574,7 +1490,7 @@ class PaychequeData:
                 item['ytd'], 'YTD', 'currency'
             )
 
-            extract_data.append([description, current, ytd])
+            extract_data.append((description, current, ytd))
 
         # Extract Total data
         total = [
@@ -1589,7 +1505,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Taxes data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['taxes'])
 
         return extract_data
 
@@ -1613,7 +1529,7 @@ class PaychequeData:
                 item['ytd'], 'YTD', 'currency'
             )
 
-            extract_data.append([description, current, ytd])
+            extract_data.append((description, current, ytd))
 
         # Extract Total data
         total = [
@@ -1628,7 +1544,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Before-Tax Deductions data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['before_tax_deductions'])
 
         return extract_data
 
@@ -1652,7 +1568,7 @@ class PaychequeData:
                 item['ytd'], 'YTD', 'currency'
             )
 
-            extract_data.append([description, current, ytd])
+            extract_data.append((description, current, ytd))
 
         # Extract Total data
         total = [
@@ -1667,7 +1583,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating After-Tax Deductions data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['after_tax_deductions'])
 
         return extract_data
 
@@ -1691,7 +1607,7 @@ class PaychequeData:
                 item['ytd'], 'YTD', 'currency'
             )
 
-            extract_data.append([description, current, ytd])
+            extract_data.append((description, current, ytd))
 
         # Extract Total data
         total = [
@@ -1706,7 +1622,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Employer Paid Benefits data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['employer_paid_benefits'])
 
         return extract_data
 
@@ -1716,7 +1632,7 @@ class PaychequeData:
 
         coords = self.extract_coordinates
 
-        extract_data = [
+        extract_data = (
             self._extract_from_pdf(
                 coords['gross_and_net']['current']['total_gross'],
                 'Current - Total Gross',
@@ -1767,7 +1683,7 @@ class PaychequeData:
                 'YTD - Net Pay',
                 'currency',
             ),
-        ]
+        )
 
         return [extract_data]
 
@@ -1777,7 +1693,17 @@ class PaychequeData:
 
         coords = self.extract_coordinates
 
-        extract_data = [
+        # Handle next-year vacation
+        if isinstance(coords['vacation']['next_year'], Coordinates):
+            next_year = self._extract_from_pdf(
+                coords['vacation']['next_year'],
+                'Next Year',
+                'number',
+            )
+        else:
+            next_year = 0
+
+        extract_data = (
             self._extract_from_pdf(
                 coords['vacation']['current'],
                 'Current',
@@ -1788,19 +1714,8 @@ class PaychequeData:
                 'Supplemental',
                 'number',
             ),
-        ]
-
-        # Handle next-year vacation
-        try:
-            extract_data.append(self._extract_from_pdf(
-                coords['vacation']['next_year'],
-                'Next Year',
-                'number',
-            ))
-        except AttributeError:
-            extract_data.append(
-                {'name': 'Next Year', 'value': 0, 'data_type': 'number'}
-            )
+            next_year,
+        )
 
         return [extract_data]
 
@@ -1810,7 +1725,7 @@ class PaychequeData:
 
         coords = self.extract_coordinates
 
-        extract_data = [
+        extract_data = (
             self._extract_from_pdf(
                 coords['bank_balances']['ytd_ot_bank'],
                 'YTD OT Bank',
@@ -1831,7 +1746,7 @@ class PaychequeData:
                 'YTD Float Bank',
                 'number',
             ),
-        ]
+        )
 
         return [extract_data]
 
@@ -1841,9 +1756,9 @@ class PaychequeData:
 
         coords = self.extract_coordinates
 
-        extract_data = [self._extract_from_pdf(
+        extract_data = (self._extract_from_pdf(
             coords['advance_outstanding']['os_advance'], 'OS/Advance', 'currency',
-        )]
+        ),)
 
         return [extract_data]
 
@@ -1864,7 +1779,7 @@ class PaychequeData:
                 item['deposit_amount'], 'Deposit Amount', 'currency'
             )
 
-            extract_data.append([account_type, deposit_amount])
+            extract_data.append((account_type, deposit_amount))
 
         # Extract Total data
         total = [
@@ -1876,7 +1791,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Direct Deposit Distribution data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['direct_deposit_distribution'])
 
         return extract_data
 
@@ -1897,7 +1812,7 @@ class PaychequeData:
                 item['amount'], 'Amount', 'currency'
             )
 
-            extract_data.append([advice_number, amount])
+            extract_data.append((advice_number, amount))
 
         # Extract Total data
         total = [
@@ -1909,7 +1824,7 @@ class PaychequeData:
 
         # Validate the extracted data
         self.log.info('    Validating Net Pay Distribution data')
-        self._validate_extracted_data(extract_data, total)
+        self._validate_extracted_data(extract_data, total, TABLE_SCHEMAS['net_pay_distribution'])
         return extract_data
 
     def _extract_message(self):
@@ -1918,53 +1833,36 @@ class PaychequeData:
 
         coords = self.extract_coordinates
 
-        extract_data = self._extract_from_pdf(coords['message'], 'Message')
+        message = self._extract_from_pdf(coords['message'], 'Message')
 
         # Remove the "MESSAGE:" label
-        extract_data['value'] = extract_data['value'].replace('MESSAGE:', '').strip()
-        self.log.debug(f'    Extracted value after second formatting: {extract_data["value"]}')
-
-        return [[extract_data]]
-
-    def _extract_data(self):
-        """Extracts data from all collected coordinates."""
-        self.log.info('Extracting data from PDF')
-
-        paycheque_details = self._extract_paycheque_details()
-        baseline_details = self._extract_baseline_details()
-        tax_data = self._extract_tax_data()
-        hours_and_earnings = self._extract_hours_and_earnings()
-        taxes = self._extract_taxes()
-        before_tax_deductions = self._extract_before_tax_deductions()
-        after_tax_deductions = self._extract_after_tax_deductions()
-        employer_paid_benefits = self._extract_employer_paid_benefits()
-        gross_and_net = self._extract_gross_and_net()
-        vacation = self._extract_vacation()
-        bank_balances = self._extract_bank_balances()
-        advance_outstanding = self._extract_advance_outstanding()
-        direct_deposit_distribution = self._extract_direct_deposit_distribution()
-        net_pay_distribution = self._extract_net_pay_distribution()
-        message = self._extract_message()
-
-        data = {
-            'paycheque_details': paycheque_details,
-            'baseline_details': baseline_details,
-            'tax_data': tax_data,
-            'hours_and_earnings': hours_and_earnings,
-            'taxes': taxes,
-            'before_tax_deductions': before_tax_deductions,
-            'after_tax_deductions': after_tax_deductions,
-            'employer_paid_benefits': employer_paid_benefits,
-            'gross_and_net': gross_and_net,
-            'vacation': vacation,
-            'bank_balances': bank_balances,
-            'advance_outstanding': advance_outstanding,
-            'direct_deposit_distribution': direct_deposit_distribution,
-            'net_pay_distribution': net_pay_distribution,
-            'message': message,
-        }
+        message = message.replace('MESSAGE:', '').strip()
+        self.log.debug(f'    Extracted value after second formatting: {message}')
 
-        return data
+        return [(message,)]
+
+    def get_table(self, key):
+        """Returns the extracted data for a table.
+
+            The table's coordinates are identified and its data extracted
+            the first time it is requested. Each table is a list of rows,
+            and each row is a tuple of values in the order of its fields
+            in TABLE_SCHEMAS.
+        """
+        if key not in self.tables_data:
+            self._identify_table_coordinates(key)
+
+            _, extract_table = self.table_methods[key]
+
+            with self.metrics.time(f'extract_{key}'):
+                self.tables_data[key] = extract_table()
+
+        return self.tables_data[key]
+
+    @property
+    def data(self):
+        """The extracted data for each of the selected tables."""
+        return {key: self.get_table(key) for key in self.tables}
 
     def _obtain_and_draw_coords(self, coords):
         """Function to isolate down to a Coordinates object."""
@@ -1983,27 +1881,126 @@ class PaychequeData:
 
     def draw_extract_coords(self):
         """Draws boxes around the extract coordinates for debugging."""
+        for key in self.tables:
+            self.get_table(key)
+
         for _, coords in self.extract_coordinates.items():
             self._obtain_and_draw_coords(coords)
 
         self.pdf.save(f'debug_{int(time())}.pdf')
 
-    def __init__(self, pdf, log):
+    def close(self):
+        """Closes the PDF and releases the page and its parsed text.
+
+            Tables that have already been extracted remain available.
+        """
+        self.page = None
+        self.anchor_index = None
+        self.cell_extractor = None
+        self.cell_text = {}
+        self.pdf.close()
+
+    def __init__(self, pdf, log, template_cache=None, tables=None, metrics=None, page_number=0):
         self.pdf = pdf
         self.log = log
-        self.page = self.pdf.load_page(0)
+        self.tables = tuple(TABLE_SCHEMAS) if tables is None else tuple(tables)
+
+        # Timings and counters for each step of the extraction
+        self.metrics = Metrics() if metrics is None else metrics
+
+        with self.metrics.time('index_anchors'):
+            self.page = self.pdf.load_page(page_number)
+            self.anchor_index = AnchorIndex(self.page, metrics=self.metrics)
+
+        # Reuse any anchors already resolved for this page layout
+        if template_cache is not None:
+            with self.metrics.time('fingerprint_page'):
+                fingerprint = fingerprint_page(self.page, self.anchor_index)
+                self.anchor_index.template = template_cache.get(fingerprint)
+
+        # Identify the version of the layout and the labels it uses
+        with self.metrics.time('detect_layout'):
+            self.layout = detect_layout(self.anchor_index)
+
+            if self.layout is None:
+                self.log.warning('  Unrecognized pay advice layout; using the current labels')
+                self.layout = LAYOUT_VERSIONS[0]
+
+            # Labels missing from the detected version fall back to those of the others
+            self.labels = resolve_labels(self.layout, self.anchor_index)
+
+        self.metrics.count(f'layout_{self.layout.name}')
+
         self.page_coordinates = Coordinates(self.page.rect)
-        left_margin, right_margin = self._identify_margins()
+
+        with self.metrics.time('identify_margins'):
+            left_margin, right_margin = self._identify_margins()
+
         self.left_margin = left_margin
         self.right_margin = right_margin
-        self.extract_coordinates = self._identify_coordinates()
-        self.data = self._extract_data()
 
-def extract_data(pdf_path, config, log):
-    pdf = fitz.open(pdf_path)
-    data = PaychequeData(pdf, log)
+        # Methods to identify the coordinates of and extract each table
+        self.table_methods = {
+            'paycheque_details': (self._identify_pay_advice_coordinate, self._extract_paycheque_details),
+            'baseline_details': (self._identify_demographic_coordinates, self._extract_baseline_details),
+            'tax_data': (self._identify_tax_data_coordinates, self._extract_tax_data),
+            'hours_and_earnings': (self._identify_hours_coordinates, self._extract_hours_and_earnings),
+            'taxes': (self._identify_taxes_coordinates, self._extract_taxes),
+            'before_tax_deductions': (self._identify_before_tax_coordinates, self._extract_before_tax_deductions),
+            'after_tax_deductions': (self._identify_after_tax_coordinates, self._extract_after_tax_deductions),
+            'employer_paid_benefits': (
+                self._identify_employer_benefits_coordinates, self._extract_employer_paid_benefits
+            ),
+            'gross_and_net': (self._identify_gross_and_net_coordinates, self._extract_gross_and_net),
+            'vacation': (self._identify_vacation_coordinates, self._extract_vacation),
+            'bank_balances': (self._identify_bank_balances_coords, self._extract_bank_balances),
+            'advance_outstanding': (
+                self._identify_advance_outstanding_coordinates, self._extract_advance_outstanding
+            ),
+            'direct_deposit_distribution': (
+                self._identify_direct_deposit_coordinates, self._extract_direct_deposit_distribution
+            ),
+            'net_pay_distribution': (
+                self._identify_net_pay_distribution_coordinates, self._extract_net_pay_distribution
+            ),
+            'message': (self._identify_message_coordinates, self._extract_message),
+        }
+
+        # Coordinates, text and data are collected as each table is requested
+        self.extract_coordinates = {'totals': {}}
+        self.cell_extractor = None
+        self.cell_text = {}
+        self.tables_data = {}
+
+        # The layout and rows of the row tables, found together when first needed
+        self.row_tables = {}
+        self.table_rows = {}
+
+    def __enter__(self):
+        """Returns the object for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Closes the PDF when leaving the context."""
+        self.close()
+
+def extract_data(pdf_path, config, log, template_cache=None, stream=None, page_number=0):
+    metrics = Metrics()
+
+    # Use the PDF contents if they have already been read
+    with metrics.time('open_pdf'):
+        if stream is None:
+            pdf = fitz.open(pdf_path)
+        else:
+            pdf = fitz.open(stream=stream, filetype='pdf')
+
+    try:
+        data = PaychequeData(pdf, log, template_cache, config['tables'], metrics, page_number)
 
-    if config['save_coordinates']:
-        data.draw_extract_coords()
+        if config['save_coordinates']:
+            data.draw_extract_coords()
+    except Exception:
+        pdf.close()
+        raise
 
     return data
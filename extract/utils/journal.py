@@ -0,0 +1,145 @@
+"""Records the progress of each PDF so an interrupted run can be resumed."""
+import json
+import os
+from threading import RLock
+
+# Number of PDFs finished (moved) before the journal is compacted again, so
+# it does not grow without limit in watch mode
+_COMPACT_SIZE = 1000
+
+
+class JobJournal:
+    """Write-ahead journal of the state of each PDF in a run.
+
+        Each change of state (discovered, extracted, saved or moved) is
+        appended to the journal as a JSON line and flushed before the
+        run moves on, so a run that crashes can be resumed by the next
+        one: PDFs that were fully saved are only moved, and only the
+        pages that were not saved are extracted and saved again. PDFs are
+        identified by their path, size and modification time, so a PDF
+        that has changed is processed from the start. When the journal
+        is opened (and after every _COMPACT_SIZE PDFs are finished), it
+        is compacted to the PDFs that were not finished.
+    """
+    def _apply(self, record):
+        """Applies a journal record to the state of each PDF."""
+        file = record['file']
+
+        if record['state'] == 'discovered':
+            self.files[file] = {'size': record['size'], 'mtime': record['mtime'], 'pages': None, 'saved': set()}
+        elif record['state'] == 'saved' and file in self.files:
+            self.files[file]['pages'] = record['pages']
+            self.files[file]['saved'].add(record['page'])
+        elif record['state'] == 'moved':
+            self.files.pop(file, None)
+            self.finished += 1
+
+    def _load(self):
+        """Loads the state of each unfinished PDF from the journal."""
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    self._apply(json.loads(line))
+                except (ValueError, KeyError):
+                    # The last record may be incomplete if the run crashed while writing it
+                    self.log.warning(f'Skipping incomplete job journal record: {line.strip()}')
+
+        # PDFs that are no longer in place were finished (or removed) after the last record
+        self.files = {file: entry for file, entry in self.files.items() if os.path.exists(file)}
+
+        if self.files:
+            self.log.info(f'Resuming {len(self.files)} unfinished file(s) from the job journal')
+
+    def _compact(self):
+        """Rewrites the journal with only the records of the unfinished PDFs."""
+        temp_path = self.path.with_suffix('.tmp')
+
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for path, entry in self.files.items():
+                records = [{'file': path, 'state': 'discovered', 'size': entry['size'], 'mtime': entry['mtime']}]
+                records.extend(
+                    {'file': path, 'state': 'saved', 'page': page, 'pages': entry['pages']}
+                    for page in sorted(entry['saved'])
+                )
+
+                for record in records:
+                    file.write(f'{json.dumps(record)}\n')
+
+            # The records of the unfinished PDFs must be on disk before they replace the journal
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp_path, self.path)
+        self.finished = 0
+
+    def _append(self, record):
+        """Appends a record to the journal and flushes it to the operating system."""
+        with self.lock:
+            self._apply(record)
+            self.journal_file.write(f'{json.dumps(record)}\n')
+            self.journal_file.flush()
+
+            if self.finished >= _COMPACT_SIZE:
+                self.journal_file.close()
+                self._compact()
+                self.journal_file = open(self.path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
+
+    def discover(self, file, stat):
+        """Records a discovered PDF, unless it is the same PDF as an unfinished one."""
+        with self.lock:
+            entry = self.files.get(str(file))
+
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                return
+
+            self._append({'file': str(file), 'state': 'discovered', 'size': stat.st_size, 'mtime': stat.st_mtime_ns})
+
+    def saved_pages(self, file):
+        """Returns the set of page numbers of a PDF that have been saved."""
+        with self.lock:
+            entry = self.files.get(str(file))
+
+            return set(entry['saved']) if entry else set()
+
+    def is_saved(self, file):
+        """Returns whether every page of a PDF has been saved."""
+        with self.lock:
+            entry = self.files.get(str(file))
+
+            return bool(entry) and entry['pages'] is not None and len(entry['saved']) == entry['pages']
+
+    def extracted(self, file, page_number):
+        """Records that a page of a PDF has been extracted."""
+        self._append({'file': str(file), 'state': 'extracted', 'page': page_number})
+
+    def saved(self, file, page_number, page_count):
+        """Records that the data of a page of a PDF has been saved."""
+        self._append({'file': str(file), 'state': 'saved', 'page': page_number, 'pages': page_count})
+
+    def moved(self, file):
+        """Records that a PDF has been moved (so it is finished)."""
+        self._append({'file': str(file), 'state': 'moved'})
+
+    def close(self):
+        """Flushes the journal to disk and closes it."""
+        with self.lock:
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())
+            self.journal_file.close()
+
+    def __init__(self, log, path):
+        self.log = log
+        self.path = path
+        self.lock = RLock()
+        self.files = {}
+        self.finished = 0
+
+        self.log.info(f'Opening job journal: {self.path}')
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._compact()
+        self.journal_file = open(self.path, 'a', encoding='utf-8')  # pylint: disable=consider-using-with
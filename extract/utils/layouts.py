@@ -0,0 +1,139 @@
+"""Detects the version of a pay advice layout and the labels it uses."""
+from collections import namedtuple
+
+
+# A version of the pay advice layout:
+#   name: identifies the version (e.g. in the run metrics).
+#   signature: labels that are only all present on this version.
+#   labels: the text of each label used to locate the extracted values.
+LayoutVersion = namedtuple('LayoutVersion', ['name', 'signature', 'labels'])
+
+# Labels of the current pay advice layout
+LABELS = {
+    # Paycheque and employee details
+    'pay_begin_date': 'Pay Begin Date:',
+    'pay_end_date': 'Pay End Date:',
+    'advice_number': 'Advice #:',
+    'advice_date': 'Advice Date:',
+    'employee_id': 'Employee ID:',
+    'department': 'Department:',
+    'location': 'Location:',
+    'job_title': 'Job Title:',
+    'pay_rate': 'Pay Rate:',
+
+    # Tax data
+    'tax_data': 'TAX DATA:',
+    'quebec': 'Quebec',
+    'net_claim_amount': 'Net Claim Amount:',
+    'special_letters': 'Special Letters:',
+    'additional_percent': 'Addl. Percent:',
+    'additional_amount': 'Addl. Amount:',
+
+    # Section headings
+    'hours_and_earnings': 'HOURS AND EARNINGS',
+    'taxes': 'TAXES',
+    'before_tax_deductions': 'BEFORE-TAX DEDUCTIONS',
+    'after_tax_deductions': 'AFTER-TAX DEDUCTIONS',
+    'employer_paid_benefits': 'EMPLOYER PAID BENEFITS',
+    'cit_taxable_gross': 'CIT TAXABLE GROSS',
+    'vacation_accrual': 'Vacation Accrual',
+    'ytd_bank_balances': 'YTD Bank Balances',
+    'advance_outstanding': 'Advance Outstanding',
+    'direct_deposit_distribution': 'DIRECT DEPOSIT DISTRIBUTION',
+    'net_pay_distribution': 'NET PAY DISTRIBUTION',
+    'message': 'MESSAGE',
+
+    # Column headings and totals of the row tables
+    'description': 'Description',
+    'rate': 'Rate',
+    'hours': 'Hours',
+    'earnings': 'Earnings',
+    'current': 'Current',
+    'ytd': 'YTD',
+    'table_total': 'TOTAL:',
+    'taxable': 'TAXABLE',
+    'account_type': 'Account Type',
+    'deposit_amount': 'Deposit Amount',
+    'advice': 'Advice',
+    'total': 'TOTAL',
+
+    # Gross and net pay
+    'total_gross': 'TOTAL GROSS',
+    'total_taxes': 'TOTAL TAXES',
+    'total_deductions': 'TOTAL DEDUCTIONS',
+    'net_pay': 'NET PAY',
+    'current_amounts': 'Current:',
+    'ytd_amounts': 'YTD:',
+
+    # Vacation, bank balances and advances
+    'supplemental': 'supplemental',
+    'next_year': 'Next Year:',
+    'ytd_ot_bank': 'YTD OT Bank',
+    'ytd_sick_bank': 'YTD Sick Bank',
+    'ytd_stat_bank': 'YTD Stat Bank',
+    'ytd_float_bank': 'YTD Float Bank',
+    'os_advance': 'OS/Advance',
+}
+
+# Each version of the layout, in the order they are checked; to support a
+# new version of the format, add it here with the labels that changed
+LAYOUT_VERSIONS = (
+    LayoutVersion('current', ('Net Claim Amount:',), LABELS),
+    LayoutVersion('abbreviated', ('Net Claim Amt.:',), {
+        **LABELS,
+        'net_claim_amount': 'Net Claim Amt.:',
+        'special_letters': 'Spcl. Letters:',
+        'additional_percent': 'Addl. Pct.:',
+        'additional_amount': 'Addl. Amt.:',
+    }),
+)
+
+# Labels whose text differs between versions of the layout
+VARIANT_LABELS = tuple(
+    label for label in LABELS if len({version.labels[label] for version in LAYOUT_VERSIONS}) > 1
+)
+
+
+def detect_layout(anchor_index):
+    """Detects the layout version of a page from its signature labels.
+
+        Parameters:
+            anchor_index (obj): the AnchorIndex for the page.
+
+        Returns:
+            obj: the matching LayoutVersion (or None if no version matches).
+    """
+    for version in LAYOUT_VERSIONS:
+        if all(anchor_index.search_for(label) for label in version.signature):
+            return version
+
+    return None
+
+def resolve_labels(version, anchor_index):
+    """Resolves the text of each label on a page, starting from its layout version.
+
+        Some pages mix the labels of different versions (e.g. 'Net Claim
+        Amt.:' with 'Special Letters:'), so a label that differs between
+        versions and is not found with the text of the detected version
+        falls back to the text of the first other version found on the
+        page.
+
+        Parameters:
+            version (obj): the LayoutVersion detected for the page.
+            anchor_index (obj): the AnchorIndex for the page.
+
+        Returns:
+            dict: the text of each label on the page.
+    """
+    labels = dict(version.labels)
+
+    for label in VARIANT_LABELS:
+        if anchor_index.search_for(labels[label]):
+            continue
+
+        for other in LAYOUT_VERSIONS:
+            if anchor_index.search_for(other.labels[label]):
+                labels[label] = other.labels[label]
+                break
+
+    return labels
@@ -0,0 +1,223 @@
+"""Collects timings and counters for the extraction of each PDF."""
+from array import array
+from contextlib import contextmanager
+import heapq
+import json
+import statistics
+import sys
+from threading import Lock, current_thread, local, main_thread
+from time import perf_counter
+import tracemalloc
+
+# The resource module is only available on Unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# The stages being timed in each thread (see Metrics.time)
+_active_stages = local()
+
+
+class Metrics:
+    """Holds the timings and counters for the extraction of one PDF.
+
+        Timings are in seconds (from a monotonic clock) and accumulate
+        if a stage runs more than once. If tracemalloc is tracing, the
+        peak memory allocated during each stage (in bytes) is recorded
+        too. The tracemalloc peak is shared by the whole process, so it
+        is only reset and recorded for the outermost stage on the main
+        thread; a nested stage or one in another thread would reset the
+        peak of the stage it overlaps. Allocations made by other threads
+        at the same time (e.g. saving, with a single worker) are still
+        included, so the peaks are most accurate with workers. The object
+        only holds plain dictionaries so it can be returned from a worker
+        process.
+    """
+    __slots__ = ('timings', 'counters', 'memory')
+
+    def add_time(self, stage, seconds):
+        """Adds time to a stage."""
+        self.timings[stage] = self.timings.get(stage, 0) + seconds
+
+    @contextmanager
+    def time(self, stage):
+        """Times the code within the context as a stage."""
+        depth = getattr(_active_stages, 'depth', 0)
+        tracing = depth == 0 and current_thread() is main_thread() and tracemalloc.is_tracing()
+
+        if tracing:
+            start_memory, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        _active_stages.depth = depth + 1
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.add_time(stage, perf_counter() - start)
+            _active_stages.depth = depth
+
+            if tracing:
+                _, peak_memory = tracemalloc.get_traced_memory()
+                self.memory[stage] = max(self.memory.get(stage, 0), peak_memory - start_memory)
+
+    def count(self, name, amount=1):
+        """Increments a counter."""
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def as_dict(self):
+        """Returns the timings (in milliseconds) and counters."""
+        return {
+            'timings_ms': {stage: seconds * 1000 for stage, seconds in self.timings.items()},
+            'counters': dict(self.counters),
+            'memory_peak_kb': {stage: size / 1024 for stage, size in self.memory.items()},
+        }
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+        self.memory = {}
+
+def _max_rss_kb():
+    """Returns the maximum resident memory of the process in KB (if available)."""
+    if resource is None:
+        return None
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports the size in bytes rather than KB
+    return max_rss / 1024 if sys.platform == 'darwin' else max_rss
+
+def _percentile(values, percent):
+    """Returns a percentile of the values (using linear interpolation)."""
+    if len(values) == 1:
+        return values[0]
+
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+class RunMetrics:
+    """Aggregates the Metrics of each PDF extracted in a run.
+
+        Only the durations of each stage and the totals of each counter
+        are kept for every file, along with the full metrics of the
+        slowest files, so memory stays small for large runs. Metrics can
+        be added from multiple threads.
+    """
+    def add(self, file, metrics):
+        """Adds the metrics for a file."""
+        with self.lock:
+            self.files += 1
+
+            for stage, seconds in metrics.timings.items():
+                self.timings.setdefault(stage, array('d')).append(seconds)
+
+            for name, amount in metrics.counters.items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+            for stage, size in metrics.memory.items():
+                self.memory.setdefault(stage, array('d')).append(size)
+
+            # Keep the slowest files (ordered by their total time)
+            entry = (metrics.timings.get('total', 0), str(file), metrics.as_dict())
+
+            if len(self.slowest_files) < self.slowest_count:
+                heapq.heappush(self.slowest_files, entry)
+            else:
+                heapq.heappushpop(self.slowest_files, entry)
+
+    def add_time(self, stage, seconds):
+        """Adds the time of a stage run outside of the extraction (e.g. saving)."""
+        with self.lock:
+            self.timings.setdefault(stage, array('d')).append(seconds)
+
+    def count(self, name, amount=1):
+        """Increments a counter for something outside of the extraction (e.g. rejected files)."""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def report(self):
+        """Returns the aggregated metrics as a dictionary."""
+        with self.lock:
+            stages = {}
+
+            for stage, values in self.timings.items():
+                stages[stage] = {
+                    'files': len(values),
+                    'total_s': sum(values),
+                    'mean_ms': statistics.fmean(values) * 1000,
+                    'p50_ms': _percentile(values, 50) * 1000,
+                    'p95_ms': _percentile(values, 95) * 1000,
+                    'max_ms': max(values) * 1000,
+                }
+
+            memory = {}
+
+            for stage, sizes in self.memory.items():
+                memory[stage] = {
+                    'files': len(sizes),
+                    'mean_peak_kb': statistics.fmean(sizes) / 1024,
+                    'p95_peak_kb': _percentile(sizes, 95) / 1024,
+                    'max_peak_kb': max(sizes) / 1024,
+                }
+
+            return {
+                'files': self.files,
+                'stages': stages,
+                'counters': dict(self.counters),
+                'memory': memory,
+                'max_rss_kb': _max_rss_kb(),
+                'slowest_files': [
+                    {'file': file, **metrics} for _, file, metrics in sorted(self.slowest_files, reverse=True)
+                ],
+            }
+
+    def summary(self):
+        """Returns a table summarizing the time spent in each stage."""
+        report = self.report()
+        lines = [
+            f'{"Stage":<45} {"Files":>7} {"Total s":>9} {"Mean ms":>9} {"p50 ms":>9} {"p95 ms":>9} {"Max ms":>9}',
+        ]
+
+        for stage, stage_report in sorted(report['stages'].items(), key=lambda item: -item[1]['total_s']):
+            lines.append(
+                f'{stage:<45} {stage_report["files"]:>7} {stage_report["total_s"]:>9.2f} '
+                f'{stage_report["mean_ms"]:>9.2f} {stage_report["p50_ms"]:>9.2f} '
+                f'{stage_report["p95_ms"]:>9.2f} {stage_report["max_ms"]:>9.2f}'
+            )
+
+        for name, amount in sorted(report['counters'].items()):
+            lines.append(f'{name:<45} {amount:>7}')
+
+        if report['memory']:
+            lines.append(f'{"Memory (peak allocated)":<45} {"Files":>7} {"Mean KB":>9} {"p95 KB":>9} {"Max KB":>9}')
+
+            for stage, stage_report in sorted(report['memory'].items(), key=lambda item: -item[1]['max_peak_kb']):
+                lines.append(
+                    f'{stage:<45} {stage_report["files"]:>7} {stage_report["mean_peak_kb"]:>9.1f} '
+                    f'{stage_report["p95_peak_kb"]:>9.1f} {stage_report["max_peak_kb"]:>9.1f}'
+                )
+
+        if report['max_rss_kb'] is not None:
+            lines.append(f'Maximum resident memory: {report["max_rss_kb"] / 1024:.1f} MB')
+
+        for slowest in report['slowest_files'][:3]:
+            lines.append(f'Slow file: {slowest["file"]} ({slowest["timings_ms"].get("total", 0):.1f} ms)')
+
+        return '\n'.join(lines)
+
+    def save(self, path):
+        """Saves the aggregated metrics as a JSON report."""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=2)
+
+    def __init__(self, slowest_count=10):
+        self.lock = Lock()
+        self.files = 0
+        self.timings = {}
+        self.counters = {}
+        self.memory = {}
+        self.slowest_count = slowest_count
+        self.slowest_files = []
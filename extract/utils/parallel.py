@@ -0,0 +1,273 @@
+"""Extracts data from PDFs, optionally across a pool of worker processes."""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import signal
+from threading import Lock, RLock
+from time import perf_counter
+import tracemalloc
+
+from .extraction import extract_data
+from .templates import TemplateCache
+from .utils import setup_logging
+
+# Holds the state of a worker process (populated by _initialize_worker)
+_worker = {}
+
+
+def _initialize_worker(config):
+    """Sets up the logging, layout templates and memory tracing for a worker process."""
+    # Interrupts are handled by the main process, which stops the workers once their pages are finished
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    log = setup_logging(config)
+
+    if config['trace_memory']:
+        tracemalloc.start()
+
+    _worker['config'] = config
+    _worker['log'] = log
+    _worker['template_cache'] = TemplateCache(log, config['template_cache_path'])
+
+def _extract_file(file, stream, page_number, page_count, config, log, template_cache):
+    """Extracts data from a single page (pay advice) of a PDF.
+
+        Any error is logged and kept with the page so that it does not
+        stop the remaining pages and files from being extracted.
+
+        Returns:
+            tuple: the file path, the page number, the number of pages,
+                the extracted data (or None if the extraction failed)
+                and the Metrics of the extraction (or None if the
+                extraction failed).
+    """
+    name = f'{file} (page {page_number + 1} of {page_count})' if page_count > 1 else f'{file}'
+
+    log.info(f'Extracting data from {name}')
+
+    start = perf_counter()
+
+    try:
+        with extract_data(file, config, log, template_cache, stream, page_number) as data:
+            tables = data.data
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.error(f'  Unable to extract data from {name}: {e}')
+        return file, page_number, page_count, None, None
+
+    data.metrics.add_time('total', perf_counter() - start)
+
+    return file, page_number, page_count, tables, data.metrics
+
+def _extract_file_in_worker(file, stream, page_number, page_count):
+    """Extracts data from a single page of a PDF within a worker process.
+
+        Returns:
+            tuple: the result of _extract_file and the layout template
+                entries added by the extraction (so the main process can
+                merge and save them).
+    """
+    template_cache = _worker['template_cache']
+    result = _extract_file(file, stream, page_number, page_count, _worker['config'], _worker['log'], template_cache)
+
+    return result, template_cache.take_new_entries()
+
+def _iterate_pages(pdf_files):
+    """Yields the arguments to extract the requested pages of each PDF.
+
+        The contents of a PDF are only passed on for single page PDFs;
+        the pages of longer PDFs are each opened from the path, so their
+        contents do not need to be held (or sent to each worker) while
+        all of their pages are extracted.
+    """
+    for file, stream, page_count, page_numbers in pdf_files:
+        if page_count > 1:
+            stream = None
+
+        for page_number in page_numbers:
+            yield file, stream, page_number, page_count
+
+def _worker_ready():
+    """Returns once a worker process has been started and initialized."""
+    return True
+
+def _collect_result(future, template_cache):
+    """Returns the result of a page extracted in a worker, merging its new layout template entries."""
+    result, new_entries = future.result()
+
+    if new_entries:
+        template_cache.merge(new_entries)
+
+    return result
+
+def _extract_alone(page, pool, log, template_cache):
+    """Extracts a page on its own in the pool after a worker died, restarting the pool if the page kills one too.
+
+        Returns:
+            tuple: the result of _extract_file (with no data or metrics
+                if a worker died extracting the page).
+    """
+    file, _, page_number, page_count = page
+
+    # Hold back new pages from other threads (e.g. the daemon's requests) so a crash is this page's alone
+    with pool.isolation:
+        try:
+            return _collect_result(pool.submit(page), template_cache)
+        except BrokenProcessPool as e:
+            log.error(f'  Unable to extract data from {file} (page {page_number + 1} of {page_count}): {e}')
+            pool.restart()
+
+            return file, page_number, page_count, None, None
+
+def _extract_in_pool(pdf_files, config, log, pool, template_cache):
+    """Extracts the pages of each PDF in a pool of worker processes, yielding the results in order.
+
+        The layout template entries each worker adds are merged into the
+        template cache of this process, so they are saved with it. If a
+        worker dies (e.g. PyMuPDF crashes or it runs out of memory), every
+        page waiting in the pool fails with it, so the pool is restarted
+        and those pages are extracted again one at a time; only a page
+        that kills a worker on its own is given up on.
+    """
+    pending = deque()
+
+    def collect_oldest():
+        page, future = pending.popleft()
+
+        try:
+            yield _collect_result(future, template_cache)
+        except BrokenProcessPool:
+            log.warning('  A worker process stopped unexpectedly; restarting the workers')
+            pool.restart()
+
+            pages = [page] + [waiting_page for waiting_page, _ in pending]
+            pending.clear()
+
+            for waiting_page in pages:
+                yield _extract_alone(waiting_page, pool, log, template_cache)
+
+    for page in _iterate_pages(pdf_files):
+        pending.append((page, pool.submit(page)))
+
+        # Wait on the oldest page once each worker has pages queued
+        if len(pending) >= config['workers'] * 2:
+            yield from collect_oldest()
+
+    while pending:
+        yield from collect_oldest()
+
+
+class WorkerPool:
+    """A pool of worker processes to extract pages with, which can be restarted if a worker dies.
+
+        The processes are spawned (rather than forked) so each one sets
+        up its own PyMuPDF state and layout templates, and the pool only
+        returns once every worker is ready to extract.
+    """
+    def _start(self):
+        """Starts the worker processes and waits until each one is ready."""
+        executor = ProcessPoolExecutor(
+            max_workers=self.config['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_initialize_worker,
+            initargs=(self.config,),
+        )
+
+        for future in [executor.submit(_worker_ready) for _ in range(self.config['workers'])]:
+            future.result()
+
+        return executor
+
+    def submit(self, page):
+        """Submits a page (the arguments of _extract_file_in_worker) to be extracted."""
+        with self.isolation:
+            return self.executor.submit(_extract_file_in_worker, *page)
+
+    def restart(self):
+        """Replaces a pool that a worker died in with newly started workers.
+
+            Several threads (e.g. the daemon's requests) can share the
+            pool and see the same worker die, so the pool is only replaced
+            if it is still broken (a broken pool refuses new work).
+        """
+        with self.lock:
+            try:
+                self.executor.submit(_worker_ready)
+                return
+            except BrokenProcessPool:
+                pass
+
+            self.executor.shutdown()
+            self.executor = self._start()
+
+    def shutdown(self):
+        """Stops the worker processes."""
+        self.executor.shutdown()
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = Lock()
+        self.isolation = RLock()
+        self.executor = self._start()
+
+
+def start_workers(config):
+    """Starts a pool of worker processes, returning once every worker is ready to extract.
+
+        Workers are otherwise only started as pages are submitted, so
+        this is used to have them ready before the first PDF arrives.
+
+        Returns:
+            obj: the WorkerPool.
+    """
+    return WorkerPool(config)
+
+def extract_files(pdf_files, config, log, template_cache, pool=None):
+    """Extracts data from each page of each PDF, returning the results in order.
+
+        Each page of a PDF is a separate pay advice, so PDFs with many
+        pages (e.g. a year of pay advices or a whole department) are
+        extracted one page at a time and each page's result is returned
+        as soon as it is ready.
+
+        When more than one worker is configured, the pages are extracted
+        in a pool of processes (see WorkerPool). Only a few pages
+        per worker are submitted ahead of the results being consumed, so
+        the pages can be streamed in.
+
+        Parameters:
+            pdf_files (iterable): tuples of the PDF path, its contents
+                (or None to have the PDF opened from the path), its
+                number of pages and the page numbers to extract.
+            config (dict): the app configuration.
+            log (obj): the app logger.
+            template_cache (obj): the TemplateCache used when extracting
+                in this process (and that the layout templates built in
+                the workers are merged into).
+            pool (obj): a WorkerPool of started worker processes (see
+                start_workers) to extract with; if not provided, a pool
+                is created for the configured number of workers.
+
+        Yields:
+            tuple: the file path, the page number, the number of pages,
+                the extracted data and the Metrics of the extraction
+                (both None if the extraction failed).
+    """
+    if config['workers'] == 1:
+        for file, stream, page_number, page_count in _iterate_pages(pdf_files):
+            yield _extract_file(file, stream, page_number, page_count, config, log, template_cache)
+
+        return
+
+    if pool is not None:
+        yield from _extract_in_pool(pdf_files, config, log, pool, template_cache)
+        return
+
+    log.info(f'Extracting files with {config["workers"]} workers')
+
+    own_pool = WorkerPool(config)
+
+    try:
+        yield from _extract_in_pool(pdf_files, config, log, own_pool, template_cache)
+    finally:
+        own_pool.shutdown()
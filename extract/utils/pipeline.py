@@ -0,0 +1,445 @@
+"""Runs the extraction as a pipeline of stages joined by bounded queues."""
+import os
+from pathlib import Path
+from queue import Empty, Queue
+import signal
+from threading import Event, Thread
+from time import perf_counter
+
+from .metrics import RunMetrics
+from .parallel import extract_files, start_workers
+from .preflight import check_pdf
+from .saving import CSVWriter
+from .utils import move_pdf, reject_pdf
+from .watching import FolderWatcher
+
+# Marks the end of the items passed between two stages
+_END = object()
+
+# Maximum number of pages saved to the writers before they are committed
+_COMMIT_SIZE = 100
+
+
+def _iterate_queue(queue):
+    """Yields the items from a queue until the end marker is received."""
+    while True:
+        item = queue.get()
+
+        if item is _END:
+            return
+
+        yield item
+
+def _drain_queue(queue, thread):
+    """Discards the items put on a queue until the thread putting them has finished, so it is never left blocked."""
+    while thread.is_alive() or not queue.empty():
+        try:
+            queue.get(timeout=0.1)
+        except Empty:
+            pass
+
+def _iterate_batches(queue):
+    """Yields lists of the items waiting in a queue (waiting for at least one) until the end marker is received."""
+    while True:
+        batch = [queue.get()]
+
+        while batch[-1] is not _END and not queue.empty():
+            batch.append(queue.get())
+
+        ended = batch[-1] is _END
+
+        if ended:
+            batch.pop()
+
+        if batch:
+            yield batch
+
+        if ended:
+            return
+
+def _extract_batches(batches, config, log, template_cache, pool):
+    """Extracts each batch of read PDFs, yielding every result of a batch before waiting for the next one."""
+    for batch in batches:
+        yield from extract_files(batch, config, log, template_cache, pool)
+
+def _list_files(config, log):
+    """Yields the path of each PDF in the extract path."""
+    log.info('Collecting files for extraction')
+
+    with os.scandir(config['pdf_extract_path']) as entries:
+        for entry in entries:
+            if entry.name.endswith('.pdf') and entry.is_file():
+                yield entry.path
+
+def _discover_files(config, log, journal, stop, output_queue):
+    """Finds the PDFs to extract (recording each one in the journal).
+
+        In watch mode, the PDFs added to the extract path are found until
+        the stop event is set, rather than only the PDFs already there.
+    """
+    if config['watch']:
+        watcher = FolderWatcher(
+            log,
+            config['pdf_extract_path'],
+            config['watch_settle_seconds'],
+            config['watch_poll_seconds'],
+            config['watch_method'],
+        )
+        paths = watcher.watch(stop)
+    else:
+        paths = _list_files(config, log)
+
+    for path in paths:
+        if stop.is_set():
+            return
+
+        if journal is not None:
+            try:
+                journal.discover(path, os.stat(path))
+            except FileNotFoundError:
+                continue
+
+        output_queue.put(Path(path))
+
+def _read_files(config, log, result_cache, journal, run_metrics, input_queue, output_queue, cached_queue):
+    """Reads the contents of each PDF and checks that it is a pay advice.
+
+        PDFs with cached results are passed straight to the save stage
+        without needing to be read or extracted. PDFs that do not look
+        like a pay advice are moved to the reject path rather than
+        being extracted. The number of pages is passed on with each PDF,
+        as each page is extracted as a separate pay advice. Pages that
+        the journal shows were saved by an earlier run are skipped, and
+        PDFs with every page saved are passed through the save stage
+        (with no page) to be moved.
+    """
+    for file in _iterate_queue(input_queue):
+        try:
+            contents = None
+            saved_pages = set()
+
+            if journal is not None:
+                if journal.is_saved(file):
+                    log.info(f'  {file} was saved by an earlier run')
+                    cached_queue.put((file, None, None, None, True))
+                    continue
+
+                saved_pages = journal.saved_pages(file)
+
+            if result_cache is not None:
+                pages, contents = result_cache.lookup(file)
+
+                if pages is not None:
+                    for page_number, data in enumerate(pages):
+                        if page_number not in saved_pages:
+                            cached_queue.put((file, page_number, len(pages), data, True))
+
+                    continue
+
+            if contents is None:
+                contents = file.read_bytes()
+
+            start = perf_counter()
+            page_count, reason = check_pdf(contents)
+            run_metrics.add_time('preflight', perf_counter() - start)
+
+            if reason is not None:
+                run_metrics.count('rejected_files')
+
+                if result_cache is not None:
+                    result_cache.finish(file)
+
+                if reject_pdf(file, reason, config, log) and journal is not None:
+                    journal.moved(file)
+
+                continue
+
+            page_numbers = [page_number for page_number in range(page_count) if page_number not in saved_pages]
+
+            output_queue.put((file, contents, page_count, page_numbers))
+        except OSError as e:
+            log.error(f'  Unable to read {file}: {e}')
+
+            if result_cache is not None:
+                result_cache.finish(file)
+
+def _save_page(file, page_number, page_count, data, is_cached, log, result_cache, csv_writer, writers, run_metrics):
+    """Saves the data extracted from a page of a PDF.
+
+        Returns:
+            bool: whether the data was saved.
+    """
+    # Pages that could not be extracted are not saved
+    if data is None:
+        return False
+
+    try:
+        start = perf_counter()
+
+        if csv_writer is not None:
+            csv_writer.write(data, page_count > 1)
+
+        for writer in writers:
+            writer.write(data)
+
+        run_metrics.add_time('save', perf_counter() - start)
+
+        if result_cache is not None and not is_cached:
+            result_cache.store(file, data, page_number, page_count)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.error(f'  Unable to save data from {file} (page {page_number + 1}): {e}')
+        return False
+
+    return True
+
+def _commit_saved(writers, journal, saved_pages, saved_files, output_queue):
+    """Commits the writers, records the saved pages and passes the saved PDFs on to be moved."""
+    for writer in writers:
+        writer.commit()
+
+    if journal is not None:
+        for file, page_number, page_count in saved_pages:
+            journal.saved(file, page_number, page_count)
+
+    for file in saved_files:
+        output_queue.put(file)
+
+    saved_pages.clear()
+    saved_files.clear()
+
+def _save_files(config, log, result_cache, writers, journal, run_metrics, input_queue, output_queue):
+    """Saves the data extracted from each page to the CSVs and any writers.
+
+        A PDF is passed on to be moved once all of its pages have been
+        saved; PDFs with any page that could not be extracted or saved
+        are left in place. The CSVs are written by a CSVWriter that lives
+        for the whole stage. The writers are committed in batches, and
+        the saved pages are only recorded in the journal (and their PDFs
+        moved) once they have been committed, so a PDF is never moved
+        before its data is kept. In watch mode, the writers are also
+        committed whenever no more pages are waiting to be saved, so
+        each new PDF is finished without waiting for a full batch.
+        Writers that only keep their data once closed (e.g. an
+        ExcelWriter) are closed at the end of the stage, and no pages
+        are recorded (or PDFs moved) before then.
+    """
+    csv_writer = None
+    closing_writers = [writer for writer in writers if writer.commits_on_close]
+
+    if closing_writers and config['watch']:
+        log.warning('PDFs are only moved once the Excel workbook is saved (when watching stops)')
+
+    # The CSVs only need to be flushed to disk before their pages are recorded in the journal
+    if 'csv' in config['outputs']:
+        csv_writer = CSVWriter(log, config['data_path'], config['tables'], durable=journal is not None)
+
+    committed_writers = [writer for writer in (csv_writer, *writers) if writer is not None]
+
+    # The number of pages still to be saved and whether any failed, by file
+    progress = {}
+    saved_pages = []
+    saved_files = []
+
+    try:
+        for file, page_number, page_count, data, is_cached in _iterate_queue(input_queue):
+            # PDFs saved by an earlier run have no page to save and are only passed on to be moved
+            if page_number is None:
+                saved_files.append(file)
+            else:
+                if file not in progress:
+                    previously_saved = len(journal.saved_pages(file)) if journal is not None else 0
+                    progress[file] = (page_count - previously_saved, False)
+
+                saved = _save_page(
+                    file, page_number, page_count, data, is_cached, log, result_cache, csv_writer, writers, run_metrics
+                )
+                remaining, failed = progress.pop(file)
+                remaining -= 1
+                failed = failed or not saved
+
+                if saved:
+                    saved_pages.append((file, page_number, page_count))
+
+                if remaining:
+                    progress[file] = (remaining, failed)
+                else:
+                    if result_cache is not None:
+                        result_cache.finish(file)
+
+                    if not failed:
+                        saved_files.append(file)
+
+            if closing_writers:
+                continue
+
+            is_idle = config['watch'] and (saved_pages or saved_files) and input_queue.empty()
+
+            if len(saved_pages) >= _COMMIT_SIZE or is_idle:
+                start = perf_counter()
+                _commit_saved(committed_writers, journal, saved_pages, saved_files, output_queue)
+                run_metrics.add_time('commit', perf_counter() - start)
+
+        for writer in closing_writers:
+            writer.close()
+
+        _commit_saved(committed_writers, journal, saved_pages, saved_files, output_queue)
+    finally:
+        if csv_writer is not None:
+            csv_writer.close()
+
+def _move_files(config, log, journal, run_metrics, input_queue):
+    """Moves each saved PDF to the configured path (recording it in the journal)."""
+    for file in _iterate_queue(input_queue):
+        start = perf_counter()
+
+        if move_pdf(file, config, log) and journal is not None:
+            journal.moved(file)
+
+        run_metrics.add_time('move', perf_counter() - start)
+
+def _start_stage(name, target, input_queue, output_queue, errors):
+    """Runs a stage in a thread, always passing on the end marker.
+
+        If the stage fails, its remaining input is drained so the earlier
+        stages are not left waiting on a full queue.
+    """
+    def run_stage():
+        try:
+            target()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append((name, e))
+
+            if input_queue is not None:
+                for _ in _iterate_queue(input_queue):
+                    pass
+        finally:
+            if output_queue is not None:
+                output_queue.put(_END)
+
+    thread = Thread(target=run_stage, name=name, daemon=True)
+    thread.start()
+
+    return thread
+
+def run_pipeline(config, log, template_cache, result_cache=None, writers=(), journal=None):
+    """Discovers, reads, extracts, saves and moves each PDF.
+
+        Each stage runs concurrently and hands its results to the next
+        stage through a bounded queue, so file reads, saves and moves
+        overlap with the extraction while only a limited number of files
+        are held in memory at once. Extraction runs in this thread (or
+        the worker processes, if configured). If a ResultCache is
+        provided, PDFs that were previously extracted skip extraction.
+        PDFs that do not look like a pay advice are rejected before
+        they reach the extraction. Each page of a PDF is extracted and
+        saved as a separate pay advice, and the PDF is moved once all of
+        its pages have been saved. The data is also passed to each of
+        the writers (e.g. a SQLiteWriter or ExcelWriter) from the save
+        stage. If a JobJournal is provided, the progress of each PDF is
+        recorded in it and any PDFs left unfinished by an earlier run
+        are resumed.
+
+        In watch mode, new PDFs are extracted as they are added to the
+        extract path until the process is interrupted or terminated,
+        after which the PDFs already found are finished.
+
+        Returns:
+            obj: the RunMetrics of the extracted, saved and moved PDFs.
+    """
+    queue_size = config['queue_size']
+    discovered_queue = Queue(queue_size)
+    read_queue = Queue(queue_size)
+    extracted_queue = Queue(queue_size)
+    saved_queue = Queue(queue_size)
+    run_metrics = RunMetrics()
+    errors = []
+    stop = Event()
+    signal_handlers = {}
+
+    # Stop watching (and finish the PDFs already found) when interrupted or terminated
+    if config['watch']:
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal_handlers[signal_number] = signal.signal(signal_number, lambda *_: stop.set())
+
+    threads = [
+        _start_stage(
+            'discover',
+            lambda: _discover_files(config, log, journal, stop, discovered_queue),
+            None,
+            discovered_queue,
+            errors,
+        ),
+        _start_stage(
+            'read',
+            lambda: _read_files(
+                config, log, result_cache, journal, run_metrics, discovered_queue, read_queue, extracted_queue
+            ),
+            discovered_queue,
+            read_queue,
+            errors,
+        ),
+        _start_stage(
+            'save',
+            lambda: _save_files(
+                config, log, result_cache, writers, journal, run_metrics, extracted_queue, saved_queue
+            ),
+            extracted_queue,
+            saved_queue,
+            errors,
+        ),
+        _start_stage(
+            'move',
+            lambda: _move_files(config, log, journal, run_metrics, saved_queue),
+            saved_queue,
+            None,
+            errors,
+        ),
+    ]
+
+    # The workers only hold back pages while more are coming, so in watch mode the PDFs read so far are
+    # extracted as a batch (with workers started once for the run) rather than waiting on the next PDF
+    read_files = _iterate_batches(read_queue) if config['watch'] else _iterate_queue(read_queue)
+    pool = None
+
+    try:
+        if config['watch']:
+            if config['workers'] > 1:
+                log.info(f'Starting {config["workers"]} workers')
+                pool = start_workers(config)
+
+            extracted_files = _extract_batches(read_files, config, log, template_cache, pool)
+        else:
+            extracted_files = extract_files(read_files, config, log, template_cache)
+
+        for file, page_number, page_count, data, metrics in extracted_files:
+            if metrics is not None:
+                run_metrics.add(f'{file} (page {page_number + 1})' if page_count > 1 else file, metrics)
+
+                if journal is not None:
+                    journal.extracted(file, page_number)
+
+            extracted_queue.put((file, page_number, page_count, data, False))
+    except BaseException:
+        # Stop discovering and drain the remaining reads so the earlier stages can finish; the queue itself
+        # is drained, as an interrupt while waiting on it ends the read_files generator
+        stop.set()
+        _drain_queue(read_queue, threads[1])  # the read stage
+
+        raise
+    finally:
+        extracted_queue.put(_END)
+
+        for thread in threads:
+            thread.join()
+
+        if pool is not None:
+            pool.shutdown()
+
+        for signal_number, handler in signal_handlers.items():
+            signal.signal(signal_number, handler)
+
+    if errors:
+        name, error = errors[0]
+        raise RuntimeError(f'The {name} stage of the pipeline failed: {error}') from error
+
+    return run_metrics
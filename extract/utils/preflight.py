@@ -0,0 +1,47 @@
+"""Checks whether a PDF looks like a pay advice before it is extracted."""
+import fitz
+
+from .layouts import LAYOUT_VERSIONS
+
+# Labels from the header of a pay advice; a PDF is only extracted if its
+# first page has all of these labels for one of the layout versions
+PROBE_LABELS = ['pay_begin_date', 'advice_number', 'employee_id']
+
+
+def check_pdf(contents):
+    """Checks whether the contents of a PDF look like a pay advice.
+
+        This only opens the PDF, checks that it is not encrypted and has
+        pages, and reads the text of the first page, so files that are
+        not pay advices can be rejected without being extracted. The
+        document metadata is not checked, as the producer of the pay
+        advices is not known for every layout version. PDFs with more
+        than one page hold one pay advice per page.
+
+        Parameters:
+            contents (bytes): the contents of the PDF.
+
+        Returns:
+            tuple: the number of pages in the PDF and the reason it was
+                rejected (or None if it looks like a pay advice).
+    """
+    try:
+        pdf = fitz.open(stream=contents, filetype='pdf')
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return 0, f'unable to open PDF ({e})'
+
+    with pdf:
+        if pdf.needs_pass:
+            return pdf.page_count, 'PDF is encrypted'
+
+        if pdf.page_count < 1:
+            return 0, 'PDF has no pages'
+
+        page_count = pdf.page_count
+        text = pdf.load_page(0).get_text('text')
+
+    for version in LAYOUT_VERSIONS:
+        if all(version.labels[label] in text for label in PROBE_LABELS):
+            return page_count, None
+
+    return page_count, 'no pay advice labels found on the first page'
@@ -0,0 +1,151 @@
+"""Profiles a run of the extraction to find where the time is spent."""
+from collections import Counter
+import cProfile
+import os
+import pstats
+import sys
+from threading import Event, Thread, enumerate as enumerate_threads, get_ident
+
+
+def _frame_label(filename, line_number, function_name):
+    """Returns the label of a stack frame for a collapsed stack."""
+    return f'{function_name} ({os.path.basename(filename)}:{line_number})'.replace(';', ':')
+
+def _collapse_stats(stats, minimum_fraction=0.0005, maximum_depth=64):
+    """Converts cProfile stats into collapsed stacks (in microseconds).
+
+        cProfile only records the callers of each function, not complete
+        stacks. Each function's own time is split between its callers in
+        proportion to the time spent in it from each one, and this is
+        repeated up through their callers. A path stops growing (keeping
+        its time) at a function without callers, at a recursive call, at
+        the maximum depth, or once its time falls below minimum_fraction
+        of the run.
+
+        Returns:
+            obj: a Counter of the microseconds spent in each stack.
+    """
+    total_time = sum(stat[2] for stat in stats.values())
+    minimum_time = total_time * minimum_fraction
+    stacks = Counter()
+
+    def walk_up(function, path, time, caller_index):
+        callers = stats[function][4]
+        caller_total = sum(caller_stats[caller_index] for caller_stats in callers.values())
+
+        if not callers or caller_total <= 0 or len(path) >= maximum_depth:
+            stacks[';'.join(reversed(path))] += time
+            return
+
+        for caller, caller_stats in callers.items():
+            caller_time = time * caller_stats[caller_index] / caller_total
+            label = _frame_label(*caller)
+
+            if label in path or caller_time < minimum_time:
+                stacks[';'.join(reversed(path))] += caller_time
+            else:
+                walk_up(caller, path + [label], caller_time, 3)
+
+    for function, (_, _, own_time, _, _) in stats.items():
+        if own_time >= minimum_time:
+            # Split the function's own time by the time spent in it from each caller
+            walk_up(function, [_frame_label(*function)], own_time, 2)
+
+    return Counter({stack: int(time * 1_000_000) for stack, time in stacks.items() if time * 1_000_000 >= 1})
+
+def _save_collapsed_stacks(stacks, path):
+    """Saves collapsed stacks (one "frame;frame;frame count" line per stack)."""
+    with open(path, 'w', encoding='utf-8') as file:
+        for stack, count in sorted(stacks.items()):
+            file.write(f'{stack} {count}\n')
+
+
+class Profiler:
+    """Profiles a run, saving the results for flame graph tools.
+
+        Two modes are available:
+            deterministic: runs under cProfile and saves the stats (as
+                .pstats) and collapsed stacks estimated from them. Only
+                the extraction on the main thread is timed reliably:
+                cProfile follows a single call stack (and only one can
+                run at a time), so the threads that find, read, save and
+                move the PDFs are either left out or have their time
+                mixed into the main thread's calls.
+            sampling: samples the stack of every thread at a fixed
+                interval from a background thread and saves the
+                collapsed stacks (as sample counts). The overhead is low
+                enough to leave on for long production runs.
+
+        Only the main process is profiled, so use a single worker to
+        include the extraction itself.
+    """
+    def _sample(self):
+        """Records the current stack of every other thread."""
+        thread_names = {thread.ident: thread.name for thread in enumerate_threads()}
+
+        for thread_id, frame in sys._current_frames().items():  # pylint: disable=protected-access
+            if thread_id == get_ident():
+                continue
+
+            path = []
+
+            while frame is not None:
+                code = frame.f_code
+                path.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+
+            path.append(thread_names.get(thread_id, str(thread_id)))
+
+            self.samples[';'.join(reversed(path))] += 1
+
+    def _run_sampler(self):
+        """Samples the stacks until the profiler is stopped."""
+        while not self.stopped.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Starts profiling."""
+        self.log.info(f'Starting {self.mode} profiling')
+
+        if self.mode == 'deterministic':
+            self.log.warning(
+                'Deterministic profiling only times the extraction on the main thread reliably; '
+                'use sampling to profile finding, reading, saving and moving the PDFs'
+            )
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        else:
+            self.sampler = Thread(target=self._run_sampler, name='profiler', daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        """Stops profiling and saves the results."""
+        collapsed_path = self.output_path.with_suffix('.collapsed')
+
+        if self.mode == 'deterministic':
+            self.profile.disable()
+
+            stats_path = self.output_path.with_suffix('.pstats')
+            self.profile.dump_stats(stats_path)
+
+            stats = pstats.Stats(self.profile).stats  # pylint: disable=no-member
+            _save_collapsed_stacks(_collapse_stats(stats), collapsed_path)
+
+            self.log.info(f'Saved profile of the main thread to {stats_path} and {collapsed_path}')
+        else:
+            self.stopped.set()
+            self.sampler.join()
+
+            _save_collapsed_stacks(self.samples, collapsed_path)
+
+            self.log.info(f'Saved {sum(self.samples.values())} stack samples to {collapsed_path}')
+
+    def __init__(self, log, mode, output_path, interval=0.01):
+        self.log = log
+        self.mode = mode
+        self.output_path = output_path
+        self.interval = interval
+        self.profile = None
+        self.sampler = None
+        self.stopped = Event()
+        self.samples = Counter()
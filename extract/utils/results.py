@@ -0,0 +1,190 @@
+"""Caches the data extracted from each PDF by its contents."""
+from datetime import date
+from decimal import Decimal
+import hashlib
+import json
+import os
+
+from .extraction import EXTRACTOR_VERSION
+from .schemas import TABLE_SCHEMAS
+
+
+def serialize_data(data):
+    """Converts extracted data into JSON-compatible values."""
+    serialized = {}
+
+    for key, rows in data.items():
+        serialized[key] = [
+            [value.isoformat() if isinstance(value, date) else str(value) for value in row] for row in rows
+        ]
+
+    return serialized
+
+def _deserialize_data(serialized):
+    """Converts serialized data back to the extracted data types."""
+    data = {}
+
+    for key, rows in serialized.items():
+        data[key] = []
+
+        for row in rows:
+            data_row = []
+
+            for field, value in zip(TABLE_SCHEMAS[key], row):
+                if field.data_type == 'date':
+                    value = date.fromisoformat(value)
+                elif field.data_type in ('currency', 'number'):
+                    value = Decimal(value)
+
+                data_row.append(value)
+
+            data[key].append(tuple(data_row))
+
+    return data
+
+
+class ResultCache:
+    """Holds the data extracted from each PDF, keyed by its contents.
+
+        Results are stored as JSON files named by the SHA-256 hash of the
+        PDF and the extractor version, so a PDF that has already been
+        extracted only needs to be saved again. A manifest of each file's
+        size and modification time avoids reading and hashing files that
+        have not changed since they were last seen. Only the selected
+        tables are returned, and a cached result that is missing any of
+        them is extracted again. Each page of a PDF is stored in its own
+        file, and the PDF is only treated as cached once every page has
+        been stored.
+    """
+    def _load_manifest(self):
+        """Loads the manifest of previously hashed files."""
+        if not self.manifest_path.exists():
+            return {}
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            self.log.warning(f'Unable to load result cache manifest {self.manifest_path}: {e}')
+            return {}
+
+    def _result_path(self, digest, page_number=0):
+        """Returns the path of the cached result for a hash and page."""
+        if page_number == 0:
+            return self.path / f'{digest}-v{EXTRACTOR_VERSION}.json'
+
+        return self.path / f'{digest}-p{page_number + 1}-v{EXTRACTOR_VERSION}.json'
+
+    def _load_pages(self, digest):
+        """Loads the serialized data of every page cached for a hash.
+
+            Returns:
+                list: the serialized data of each page (or None if any
+                    page is missing or is missing a selected table, or
+                    the first page does not record the page count).
+        """
+        pages = []
+        page_count = None
+        page_number = 0
+
+        while page_count is None or page_number < page_count:
+            result_path = self._result_path(digest, page_number)
+
+            if not result_path.exists():
+                return None
+
+            with open(result_path, 'r', encoding='utf-8') as result_file:
+                serialized = json.load(result_file)
+
+            # Results cached for a smaller selection of tables are extracted again
+            if any(key not in serialized for key in self.tables):
+                return None
+
+            # The first page records the page count; without it, the other pages may never have been extracted
+            if page_count is None:
+                if 'page_count' not in serialized:
+                    return None
+
+                page_count = serialized['page_count']
+
+            pages.append({key: serialized[key] for key in self.tables})
+            page_number += 1
+
+        return pages
+
+    def lookup(self, file):
+        """Looks up the cached data for a PDF.
+
+            Parameters:
+                file (obj): the Path of the PDF.
+
+            Returns:
+                tuple: a list of the cached data of each page (or None if
+                    the PDF has not been extracted) and the PDF contents
+                    if they had to be read to hash the file (otherwise
+                    None).
+        """
+        stat = file.stat()
+        entry = self.manifest.get(str(file))
+        contents = None
+
+        if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            digest = entry['digest']
+        else:
+            contents = file.read_bytes()
+            digest = hashlib.sha256(contents).hexdigest()
+            self.manifest[str(file)] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'digest': digest}
+
+        pages = self._load_pages(digest)
+
+        if pages is None:
+            self.digests[file] = digest
+            return None, contents
+
+        self.log.info(f'Using cached data for {file}')
+
+        return [_deserialize_data(page) for page in pages], contents
+
+    def store(self, file, data, page_number=0, page_count=1):
+        """Stores the extracted data for a page of a PDF that has been looked up."""
+        digest = self.digests[file]
+        result_path = self._result_path(digest, page_number)
+        serialized = {}
+
+        # Keep any tables cached for an earlier selection of tables
+        if result_path.exists():
+            with open(result_path, 'r', encoding='utf-8') as result_file:
+                serialized = json.load(result_file)
+
+        serialized.update(serialize_data(data))
+
+        if page_number == 0:
+            serialized['page_count'] = page_count
+
+        # Write to a temporary file first so a partial result is never read
+        temp_path = result_path.with_suffix('.tmp')
+
+        with open(temp_path, 'w', encoding='utf-8') as result_file:
+            json.dump(serialized, result_file)
+
+        os.replace(temp_path, result_path)
+
+    def finish(self, file):
+        """Forgets the hash of a PDF once all of its pages have been stored (or failed or been skipped)."""
+        self.digests.pop(file, None)
+
+    def save(self):
+        """Saves the manifest of hashed files."""
+        self.log.info(f'Saving result cache manifest to {self.manifest_path}')
+
+        with open(self.manifest_path, 'w', encoding='utf-8') as file:
+            json.dump(self.manifest, file)
+
+    def __init__(self, log, path, tables):
+        self.log = log
+        self.path = path
+        self.tables = tables
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.path / 'manifest.json'
+        self.manifest = self._load_manifest()
+        self.digests = {}
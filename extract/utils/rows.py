@@ -0,0 +1,42 @@
+"""Locates the rows of the tables on a pay advice in a single pass."""
+from collections import namedtuple
+
+
+# Layout of a table with a variable number of rows:
+#   area: the area (rect-like) the rows of the table fall within.
+#   columns: a dictionary of the left and right edge of each column.
+#   total: the coordinates of the values in the table's total row.
+#   marker: text that appears once in each row within the area.
+#   has_total_row: whether the last marker found belongs to the total row.
+RowTable = namedtuple(
+    'RowTable', ['area', 'columns', 'total', 'marker', 'has_total_row'], defaults=['.', True]
+)
+
+
+def find_rows(anchor_index, row_tables):
+    """Finds the rows of each table in one pass over the page's lines.
+
+        Parameters:
+            anchor_index (obj): the AnchorIndex for the page.
+            row_tables (dict): the RowTable for each table key.
+
+        Returns:
+            dict: a list of the (top, bottom) of each row for each table.
+    """
+    keys = list(row_tables)
+    matches = anchor_index.search_areas(
+        [(row_tables[key].marker, row_tables[key].area) for key in keys]
+    )
+
+    rows = {}
+
+    for key, instances in zip(keys, matches):
+        table_rows = [(instance.y0, instance.y1) for instance in instances]
+
+        # Drop the total row, as its coordinates are identified separately
+        if row_tables[key].has_total_row and table_rows:
+            table_rows.pop()
+
+        rows[key] = table_rows
+
+    return rows
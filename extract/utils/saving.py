@@ -1,12 +1,209 @@
-"""Saves extracted data to an Excel file."""
+"""Saves extracted data to CSV files."""
+from concurrent.futures import ThreadPoolExecutor
 import csv
 import os
 from pathlib import Path
+from threading import Lock
 
 
-def confirm_or_create_save_directories(config, log):
+# Dictionary mapping extracted data to required output details
+DATA_MAP = {
+    'paycheque_details': {
+        'folder_name': 'Pay Cheque Details',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+        ]
+    },
+    'baseline_details': {
+        'folder_name': 'Baseline Details',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Employee ID',
+            'Department',
+            'Location',
+            'Job Title',
+            'Pay Rate',
+        ]
+    },
+    'tax_data': {
+        'folder_name': 'Tax Data',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Federal - Net Claim Amount',
+            'Federal - Special Letters',
+            'Federal - Additional Percent',
+            'Federal - Additional Amount',
+            'Alberta - Net Claim Amount',
+            'Alberta - Special Letters',
+            'Alberta - Additional Percent',
+            'Alberta - Additional Amount',
+        ]
+    },
+    'hours_and_earnings': {
+        'folder_name': 'Hours and Earnings',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Description',
+            'Current - Rate',
+            'Current - Hours',
+            'Current - Earnings',
+            'YTD - Hours',
+            'YTD - Earnings',
+        ]
+    },
+    'taxes': {
+        'folder_name': 'Taxes',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Description',
+            'Current',
+            'YTD',
+        ]
+    },
+    'before_tax_deductions': {
+        'folder_name': 'Before-Tax Deductions',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Description',
+            'Current',
+            'YTD',
+        ]
+    },
+    'after_tax_deductions': {
+        'folder_name': 'After-Tax Deductions',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Description',
+            'Current',
+            'YTD',
+        ]
+    },
+    'employer_paid_benefits': {
+        'folder_name': 'Employer Paid Benefits',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Description',
+            'Current',
+            'YTD',
+        ]
+    },
+    'gross_and_net': {
+        'folder_name': 'Gross and Net Pay',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Current - Total Gross',
+            'Current - CIT Taxable Gross',
+            'Current - Total Taxes',
+            'Current - Total Deductions',
+            'Current - Net Pay',
+            'YTD - Total Gross',
+            'YTD - CIT Taxable Gross',
+            'YTD - Total Taxes',
+            'YTD - Total Deductions',
+            'YTD - Net Pay',
+        ]
+    },
+    'vacation': {
+        'folder_name': 'Vacation',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Current',
+            'Supplemental',
+            'Next Year',
+
+        ]
+    },
+    'bank_balances': {
+        'folder_name': 'Bank Balances',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'YTD OT Bank',
+            'YTD Sick Bank',
+            'YTD Stat Bank',
+            'YTD Float Bank',
+
+        ]
+    },
+    'advance_outstanding': {
+        'folder_name': 'Advance Outstanding',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'OS/Advance',
+        ]
+    },
+    'direct_deposit_distribution': {
+        'folder_name': 'Direct Deposit Distribution',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Account Type',
+            'Deposit Amount',
+        ]
+    },
+    'net_pay_distribution': {
+        'folder_name': 'Net Pay Distribution',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Advice Number Reference',
+            'Amount',
+        ]
+    },
+    'message': {
+        'folder_name': 'Message',
+        'headers': [
+            'Pay Begin Date',
+            'Pay End Date',
+            'Advice Number',
+            'Advice Date',
+            'Message',
+        ]
+    },
+}
+
+def confirm_or_create_save_directories(data_path, log):
     """Confirms the required save directories exist and creats them if needed."""
-    log.info(f'  Confirming or creating directories to save extracted data: {config['data_path']}')
+    log.info(f'  Confirming or creating directories to save extracted data: {data_path}')
 
     required_directories = [
         'Pay Cheque Details',
@@ -27,249 +224,147 @@ def confirm_or_create_save_directories(config, log):
     ]
 
     for directory in required_directories:
-        directory_path = Path(config['data_path'], directory)
+        directory_path = Path(data_path, directory)
 
         if not directory_path.exists():
             directory_path.mkdir(exist_ok=True)
 
-def save_data(data, config, log):
-    """Saves extracted data to Excel file."""
-    log.info('Saving Data')
-
-    confirm_or_create_save_directories(config, log)
-
-    # Dictionary mapping extracted data to required output details
-    dict_map = {
-        'paycheque_details': {
-            'folder_name': 'Pay Cheque Details',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-            ]
-        },
-        'baseline_details': {
-            'folder_name': 'Baseline Details',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Employee ID',
-                'Department',
-                'Location',
-                'Job Title',
-                'Pay Rate',
-            ]
-        },
-        'tax_data': {
-            'folder_name': 'Tax Data',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Federal - Net Claim Amount',
-                'Federal - Special Letters',
-                'Federal - Additional Percent',
-                'Federal - Additional Amount',
-                'Alberta - Net Claim Amount',
-                'Alberta - Special Letters',
-                'Alberta - Additional Percent',
-                'Alberta - Additional Amount',
-            ]
-        },
-        'hours_and_earnings': {
-            'folder_name': 'Hours and Earnings',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Description',
-                'Current - Rate',
-                'Current - Hours',
-                'Current - Earnings',
-                'YTD - Hours',
-                'YTD - Earnings',
-            ]
-        },
-        'taxes': {
-            'folder_name': 'Taxes',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Description',
-                'Current',
-                'YTD',
-            ]
-        },
-        'before_tax_deductions': {
-            'folder_name': 'Before-Tax Deductions',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Description',
-                'Current',
-                'YTD',
-            ]
-        },
-        'after_tax_deductions': {
-            'folder_name': 'After-Tax Deductions',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Description',
-                'Current',
-                'YTD',
-            ]
-        },
-        'employer_paid_benefits': {
-            'folder_name': 'Employer Paid Benefits',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Description',
-                'Current',
-                'YTD',
-            ]
-        },
-        'gross_and_net': {
-            'folder_name': 'Gross and Net Pay',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Current - Total Gross',
-                'Current - CIT Taxable Gross',
-                'Current - Total Taxes',
-                'Current - Total Deductions',
-                'Current - Net Pay',
-                'YTD - Total Gross',
-                'YTD - CIT Taxable Gross',
-                'YTD - Total Taxes',
-                'YTD - Total Deductions',
-                'YTD - Net Pay',
-            ]
-        },
-        'vacation': {
-            'folder_name': 'Vacation',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Current',
-                'Supplemental',
-                'Next Year',
-
-            ]
-        },
-        'bank_balances': {
-            'folder_name': 'Bank Balances',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'YTD OT Bank',
-                'YTD Sick Bank',
-                'YTD Stat Bank',
-                'YTD Float Bank',
-
-            ]
-        },
-        'advance_outstanding': {
-            'folder_name': 'Advance Outstanding',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'OS/Advance',
-            ]
-        },
-        'direct_deposit_distribution': {
-            'folder_name': 'Direct Deposit Distribution',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Account Type',
-                'Deposit Amount',
-            ]
-        },
-        'net_pay_distribution': {
-            'folder_name': 'Net Pay Distribution',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Advice Number Reference',
-                'Amount',
-            ]
-        },
-        'message': {
-            'folder_name': 'Message',
-            'headers': [
-                'Pay Begin Date',
-                'Pay End Date',
-                'Advice Number',
-                'Advice Date',
-                'Message',
-            ]
-        },
-    }
-
-    # Collect the paycheque details; these are applied to every table
+def collect_rows(data, key):
+    """Yields the values of each row of an extracted table for saving.
+
+        The paycheque details are only held once per paycheque, so they
+        are added to the rows of the other tables as each is saved.
+    """
+    if key == 'paycheque_details':
+        yield from data[key]
+        return
+
     paycheque_details = data['paycheque_details'][0]
-    date_start = paycheque_details[0]['value'].strftime('%Y-%m-%d')
-    date_end = paycheque_details[1]['value'].strftime('%Y-%m-%d')
 
-    for key, item in dict_map.items():
-        csv_name = f'{item["folder_name"]} - {date_start} to {date_end}'
-        csv_path = Path(config['data_path'], item['folder_name'], f'{csv_name}.csv')
+    for row in data[key]:
+        yield paycheque_details + row
+
+def _write_csv(csv_path, headers, rows):
+    """Writes a CSV to a temporary file and renames it into place."""
+    temp_path = csv_path.with_name(f'{csv_path.name}.tmp')
+
+    with open(temp_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+
+        # Write the header row
+        writer.writerow(headers)
+
+        # Write the data
+        writer.writerows(rows)
+
+    # Replaces any existing CSV, so a partially written CSV is never seen
+    os.replace(temp_path, csv_path)
+
+def _fsync_directory(directory, csv_paths):
+    """Flushes the CSVs written to a directory, and then the directory itself, to disk."""
+    for csv_path in csv_paths:
+        with open(csv_path, 'r+b') as file:
+            os.fsync(file.fileno())
+
+    # Directories cannot be opened (or flushed) on Windows
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+
+    descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+class CSVWriter:
+    """Saves the extracted data from each paycheque to CSV files.
+
+        Each selected DATA_MAP entry is saved to its own CSV in its own
+        directory, named by the pay period of the advice. When the advice
+        is one of several in a PDF (e.g. a whole department for one pay
+        period), the advice number is added to the names so the advices
+        do not overwrite each other.
+
+        The writer lives for the whole run, so the directories are only
+        confirmed once. The CSVs of a paycheque are written concurrently
+        on a small pool of threads (each writing a group of the tables),
+        each to a temporary file that is renamed over any existing CSV.
+        If the writer is durable, the CSVs are flushed to disk when the
+        writer is committed (before the saved PDFs are moved) or closed,
+        with each directory's CSVs flushed together followed by one
+        fsync of the directory.
+    """
+    def _write_tables(self, tables, data, include_advice_number):
+        """Writes the CSVs of some of the tables of a paycheque."""
+        # Collect the paycheque details; these are applied to every table
+        paycheque_details = data['paycheque_details'][0]
+        date_start = paycheque_details[0].strftime('%Y-%m-%d')
+        date_end = paycheque_details[1].strftime('%Y-%m-%d')
+
+        for key in tables:
+            item = DATA_MAP[key]
+            csv_name = f'{item["folder_name"]} - {date_start} to {date_end}'
+
+            if include_advice_number:
+                csv_name = f'{csv_name} - {paycheque_details[2]}'
+
+            csv_path = Path(self.path, item['folder_name'], f'{csv_name}.csv')
+
+            self.log.info(f'  Saving data to: {csv_path}')
+
+            _write_csv(csv_path, item['headers'], collect_rows(data, key))
+
+            if self.durable:
+                with self.lock:
+                    self.written.setdefault(csv_path.parent, set()).add(csv_path)
+
+    def write(self, data, include_advice_number=False):
+        """Writes the CSVs of the extracted data from a paycheque."""
+        self.log.info('Saving Data')
 
-        log.info(f'  Saving data to: {csv_path}')
+        # Each thread writes a group of the tables, with the last group written in this thread
+        futures = [
+            self.executor.submit(self._write_tables, tables, data, include_advice_number)
+            for tables in self.table_groups[:-1]
+        ]
 
-        # Remove existing CSV if it exists
-        if csv_path.exists():
-            os.remove(csv_path)
+        self._write_tables(self.table_groups[-1], data, include_advice_number)
 
-        with open(csv_path, 'w', newline='') as file:
-            writer = csv.writer(file)
+        # Wait for every CSV, raising the first error
+        for future in futures:
+            future.result()
 
-            # Write the header row
-            writer.writerow(item['headers'])
+    def commit(self):
+        """Flushes the CSVs written since the last commit to disk (if the writer is durable)."""
+        for _ in self.executor.map(_fsync_directory, self.written, self.written.values()):
+            pass
 
-            # Organize the data for saving
-            save_data = []
+        self.written = {}
 
-            for row in data[key]:
-                row_data = []
+    def close(self):
+        """Commits the CSVs and stops the writing threads."""
+        self.commit()
+        self.executor.shutdown()
 
-                # Add Paycheque details to all other groups of data
-                if key == 'paycheque_details':
-                    updated_row = row
-                else:
-                    updated_row = paycheque_details + row
+    def __init__(self, log, path, tables, workers=4, durable=False):
+        self.log = log
+        self.path = path
+        self.tables = tables
+        self.durable = durable
+        self.written = {}
+        self.lock = Lock()
+        self.table_groups = [tables[index::workers] for index in range(min(workers, len(tables)))]
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='csv')
 
-                for cell in updated_row:
-                    row_data.append(cell['value'])
+        confirm_or_create_save_directories(self.path, self.log)
 
-                save_data.append(row_data)
+def save_data(data, config, log, include_advice_number=False):
+    """Saves extracted data from a single paycheque to CSV files (see CSVWriter)."""
+    writer = CSVWriter(log, config['data_path'], config['tables'])
 
-            # Write the data
-            writer.writerows(save_data)
+    try:
+        writer.write(data, include_advice_number)
+    finally:
+        writer.close()
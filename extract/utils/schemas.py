@@ -0,0 +1,99 @@
+"""Schemas describing the values in each table of extracted data."""
+from collections import namedtuple
+
+
+# Name and data type of a value in an extracted table
+Field = namedtuple('Field', ['name', 'data_type'])
+
+# Fields for the values of each row of each table; extracted rows are
+# tuples of values in this order, so the names and types are held once
+TABLE_SCHEMAS = {
+    'paycheque_details': (
+        Field('Pay Begin Date', 'date'),
+        Field('Pay End Date', 'date'),
+        Field('Advice Number', 'text'),
+        Field('Advice Date', 'date'),
+    ),
+    'baseline_details': (
+        Field('Employee ID', 'text'),
+        Field('Department', 'text'),
+        Field('Location', 'text'),
+        Field('Job Title', 'text'),
+        Field('Pay Rate', 'currency'),
+    ),
+    'tax_data': (
+        Field('Tax Data - Federal - Net Claim Amount', 'currency'),
+        Field('Tax Data - Federal - Special Letters', 'currency'),
+        Field('Tax Data - Federal - Additional Percent', 'number'),
+        Field('Tax Data - Federal - Additional Amount', 'currency'),
+        Field('Tax Data - alberta - Net Claim Amount', 'currency'),
+        Field('Tax Data - alberta - Special Letters', 'currency'),
+        Field('Tax Data - alberta - Additional Percent', 'number'),
+        Field('Tax Data - alberta - Additional Amount', 'currency'),
+    ),
+    'hours_and_earnings': (
+        Field('Description', 'text'),
+        Field('Rate - Current', 'currency'),
+        Field('Hours - Current', 'number'),
+        Field('Earnings - Current', 'currency'),
+        Field('Hours - YTD', 'number'),
+        Field('Earnings - YTD', 'currency'),
+    ),
+    'taxes': (
+        Field('Description', 'text'),
+        Field('Current', 'currency'),
+        Field('YTD', 'currency'),
+    ),
+    'before_tax_deductions': (
+        Field('Description', 'text'),
+        Field('Current', 'currency'),
+        Field('YTD', 'currency'),
+    ),
+    'after_tax_deductions': (
+        Field('Description', 'text'),
+        Field('Current', 'currency'),
+        Field('YTD', 'currency'),
+    ),
+    'employer_paid_benefits': (
+        Field('Description', 'text'),
+        Field('Current', 'currency'),
+        Field('YTD', 'currency'),
+    ),
+    'gross_and_net': (
+        Field('Current - Total Gross', 'currency'),
+        Field('Current - CIT Taxable Gross', 'currency'),
+        Field('Current - Total Taxes', 'currency'),
+        Field('Current - Total Deductions', 'currency'),
+        Field('Current - Net Pay', 'currency'),
+        Field('YTD - Total Gross', 'currency'),
+        Field('YTD - CIT Taxable Gross', 'currency'),
+        Field('YTD - Total Taxes', 'currency'),
+        Field('YTD - Total Deductions', 'currency'),
+        Field('YTD - Net Pay', 'currency'),
+    ),
+    'vacation': (
+        Field('Current', 'number'),
+        Field('Supplemental', 'number'),
+        Field('Next Year', 'number'),
+    ),
+    'bank_balances': (
+        Field('YTD OT Bank', 'number'),
+        Field('YTD Sick Bank', 'number'),
+        Field('YTD Stat Bank', 'number'),
+        Field('YTD Float Bank', 'number'),
+    ),
+    'advance_outstanding': (
+        Field('OS/Advance', 'currency'),
+    ),
+    'direct_deposit_distribution': (
+        Field('Account Type', 'text'),
+        Field('Deposit Amount', 'currency'),
+    ),
+    'net_pay_distribution': (
+        Field('Advice Number', 'text'),
+        Field('Amount', 'currency'),
+    ),
+    'message': (
+        Field('Message', 'text'),
+    ),
+}
@@ -0,0 +1,117 @@
+"""Caches the text anchors resolved for each pay advice layout."""
+import hashlib
+import json
+
+# Labels that do not move within a given layout; their positions (along
+# with the page size) identify the layout of a page
+LAYOUT_LABELS = [
+    'Pay Begin Date:',
+    'Advice #:',
+    'Employee ID:',
+    'TAX DATA:',
+    'Net Claim Amount:',
+    'Net Claim Amt.:',
+    'HOURS AND EARNINGS',
+    'BEFORE-TAX DEDUCTIONS',
+    'AFTER-TAX DEDUCTIONS',
+    'EMPLOYER PAID BENEFITS',
+    'CIT TAXABLE GROSS',
+    'Vacation Accrual',
+    'YTD Bank Balances',
+    'Advance Outstanding',
+    'DIRECT DEPOSIT DISTRIBUTION',
+    'NET PAY DISTRIBUTION',
+]
+
+
+def fingerprint_page(page, anchor_index):
+    """Generates a fingerprint of the page layout from its static labels.
+
+        Parameters:
+            page (obj): the PyMuPDF page.
+            anchor_index (obj): the AnchorIndex for the page.
+
+        Returns:
+            str: a hash identifying the page layout.
+    """
+    layout = [[round(value, 1) for value in page.rect]]
+
+    for label in LAYOUT_LABELS:
+        instances = anchor_index.search_for(label, cache=False)
+        layout.append([label, [[round(value, 1) for value in instance] for instance in instances]])
+
+    return hashlib.sha1(json.dumps(layout).encode('utf-8')).hexdigest()
+
+
+class TemplateCache:
+    """Holds the resolved anchor coordinates for each layout fingerprint.
+
+        Each template maps the search for one of the LAYOUT_LABELS over
+        the whole page (the only searches the fingerprint determines) to
+        the coordinates it resolved to, and holds the page margins, so
+        later pages with the same layout can skip the search. If a path
+        is provided the templates are loaded from and saved to a JSON
+        file so they survive between runs. Templates only ever gain
+        entries, so the entries added in a worker process can be taken
+        and merged into the cache of the main process, which saves them.
+    """
+    def _load(self):
+        """Loads any templates saved to disk."""
+        if self.path is None or not self.path.exists():
+            return {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            self.log.warning(f'Unable to load layout templates from {self.path}: {e}')
+            return {}
+
+    def get(self, fingerprint):
+        """Returns the template for a fingerprint, creating it if needed."""
+        if fingerprint in self.templates:
+            self.log.debug(f'  Using cached layout template {fingerprint}')
+        else:
+            self.log.debug(f'  Creating layout template {fingerprint}')
+            self.templates[fingerprint] = {}
+
+        return self.templates[fingerprint]
+
+    def take_new_entries(self):
+        """Returns the entries added to each template since they were loaded (or last taken)."""
+        new_entries = {}
+
+        for fingerprint, template in self.templates.items():
+            taken = self.taken.setdefault(fingerprint, set())
+
+            if len(taken) == len(template):
+                continue
+
+            new_entries[fingerprint] = {key: value for key, value in template.items() if key not in taken}
+            taken.update(new_entries[fingerprint])
+
+        return new_entries
+
+    def merge(self, new_entries):
+        """Adds the entries taken from another TemplateCache (see take_new_entries)."""
+        for fingerprint, entries in new_entries.items():
+            template = self.templates.setdefault(fingerprint, {})
+
+            for key, value in entries.items():
+                template.setdefault(key, value)
+
+    def save(self):
+        """Saves the templates to disk (if a path is configured)."""
+        if self.path is None:
+            return
+
+        self.log.info(f'Saving layout templates to {self.path}')
+
+        with open(self.path, 'w', encoding='utf-8') as file:
+            json.dump(self.templates, file)
+
+    def __init__(self, log, path=None):
+        self.log = log
+        self.path = path
+        self.templates = self._load()
+        self.taken = {fingerprint: set(template) for fingerprint, template in self.templates.items()}
@@ -1,4 +1,6 @@
 """Utility classes, functions and variables for the application."""
+import argparse
+from datetime import datetime
 import logging
 import os
 from pathlib import Path
@@ -6,17 +8,122 @@ import shutil
 
 from dotenv import find_dotenv, load_dotenv
 
+from .schemas import TABLE_SCHEMAS
+from .watching import WATCH_METHODS
 
-def generate_config():
+
+def parse_arguments():
+    """Parses the command line arguments for the app."""
+    parser = argparse.ArgumentParser(description='Extracts details from AHS paycheque PDFs.')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='number of worker processes to extract PDFs with (default: 1)',
+    )
+    parser.add_argument(
+        '--output',
+        nargs='+',
+        choices=['csv', 'excel', 'sqlite'],
+        default=['csv'],
+        help='formats to save the extracted data in (default: csv)',
+    )
+    parser.add_argument(
+        '--tables',
+        nargs='+',
+        choices=list(TABLE_SCHEMAS),
+        help='tables to extract (default: all); the paycheque details are always extracted',
+    )
+    parser.add_argument(
+        '--profile',
+        choices=['deterministic', 'sampling'],
+        help=(
+            'profile the run with cProfile (deterministic; only the extraction on the main thread is timed '
+            'reliably) or by sampling the stacks of every thread, including finding, reading, saving and '
+            'moving the PDFs (sampling)'
+        ),
+    )
+    parser.add_argument(
+        '--profile-output',
+        type=Path,
+        default=Path('profile'),
+        help='path (without suffix) to save the profile to (default: profile)',
+    )
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=0.01,
+        help='seconds between stack samples in sampling mode (default: 0.01)',
+    )
+    parser.add_argument(
+        '--trace-memory',
+        action='store_true',
+        help='record the peak memory allocated in each stage with tracemalloc (slows the run)',
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='keep watching the PDF extract path and extract new PDFs as they are added (until interrupted)',
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='run as a daemon that extracts the PDFs requested over local HTTP (see client.py)',
+    )
+    parser.add_argument(
+        '--metrics-report',
+        type=Path,
+        help='path to save a JSON report of the timings and counters of the run to',
+    )
+
+    return parser.parse_args()
+
+def generate_config(arguments):
     """Generates the configuration details for app."""
     load_dotenv(find_dotenv(filename='config.env'))
 
+    watch_method = os.getenv('WATCH_METHOD', 'auto')
+
+    if watch_method not in WATCH_METHODS:
+        raise ValueError(f'WATCH_METHOD must be one of {", ".join(WATCH_METHODS)} (not "{watch_method}")')
+
+    daemon_port = int(os.getenv('DAEMON_PORT', '8765'))
+    started = datetime.now()
     config = {
         'pdf_extract_path': Path(os.getenv('PDF_EXTRACT_PATH')),
         'pdf_move_path': Path(os.getenv('PDF_MOVE_PATH')),
+        'pdf_reject_path': Path(os.getenv('PDF_REJECT_PATH') or Path(os.getenv('PDF_MOVE_PATH'), 'Rejected')),
         'data_path': Path(os.getenv('DATA_PATH')),
         'log_level': int(os.getenv('LOG_LEVEL', '20')),
         'save_coordinates': os.getenv('SAVE_COORDINATES', False) == 'True',
+        'template_cache_path': Path(os.getenv('TEMPLATE_CACHE_PATH')) if os.getenv('TEMPLATE_CACHE_PATH') else None,
+        'result_cache_path': Path(os.getenv('RESULT_CACHE_PATH')) if os.getenv('RESULT_CACHE_PATH') else None,
+        'journal_path': Path(os.getenv('JOURNAL_PATH')) if os.getenv('JOURNAL_PATH') else None,
+        'workers': max(arguments.workers, 1),
+        'queue_size': int(os.getenv('QUEUE_SIZE', '8')),
+        'outputs': set(arguments.output),
+        'tables': [
+            key for key in TABLE_SCHEMAS
+            if arguments.tables is None or key == 'paycheque_details' or key in arguments.tables
+        ],
+        'watch': arguments.watch,
+        'watch_method': watch_method,
+        'watch_settle_seconds': float(os.getenv('WATCH_SETTLE_SECONDS', '2')),
+        'watch_poll_seconds': float(os.getenv('WATCH_POLL_SECONDS', '2')),
+        'serve': arguments.serve,
+        'daemon_port': daemon_port,
+        'daemon_token_path': Path(
+            os.getenv('DAEMON_TOKEN_PATH') or Path.home() / '.ahs-paycheque-extraction' / f'daemon-{daemon_port}.token'
+        ),
+        'metrics_report_path': arguments.metrics_report,
+        'trace_memory': arguments.trace_memory,
+        'profile': arguments.profile,
+        'profile_output_path': arguments.profile_output,
+        'profile_interval': arguments.profile_interval,
+        'sqlite_path': Path(os.getenv('SQLITE_PATH') or Path(os.getenv('DATA_PATH'), 'Paycheque Data.sqlite3')),
+        'excel_path': Path(
+            os.getenv('EXCEL_PATH') or Path(os.getenv('DATA_PATH'), f'Paycheque Data {started:%Y-%m-%d %H%M%S}.xlsx')
+        ),
     }
 
     return config
@@ -39,10 +146,12 @@ def setup_logging(config):
 
     return log
 
-def move_pdf(file, config, log):
-    """Moves PDF to the configured path."""
-    move_path = Path(config['pdf_move_path'], file.name)
+def _move_file(file, move_path, log):
+    """Moves a file, overwriting any existing file at the path.
 
+        Returns:
+            bool: whether the file was moved.
+    """
     try:
         shutil.move(file, move_path)
         log.info(f'  PDF moved to {move_path}')
@@ -51,5 +160,20 @@ def move_pdf(file, config, log):
             os.remove(move_path)
             shutil.move(file, move_path)
             log.info(f'  PDF moved to {move_path} (existing file overwritten)')
-        except PermissionError as e:
+        except OSError as e:
             log.info(f'  Unable to move PDF to {move_path}: {e}')
+            return False
+
+    return True
+
+def move_pdf(file, config, log):
+    """Moves PDF to the configured path (returning whether it was moved)."""
+    return _move_file(file, Path(config['pdf_move_path'], file.name), log)
+
+def reject_pdf(file, reason, config, log):
+    """Moves a PDF that is not a pay advice to the configured reject path (returning whether it was moved)."""
+    log.warning(f'  Rejecting {file}: {reason}')
+
+    config['pdf_reject_path'].mkdir(parents=True, exist_ok=True)
+
+    return _move_file(file, Path(config['pdf_reject_path'], file.name), log)
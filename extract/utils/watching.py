@@ -0,0 +1,247 @@
+"""Watches the extract path for new PDFs, using inotify where it is available."""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from time import monotonic
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# How new PDFs can be found (WATCH_METHOD): inotify where it is available, or always polling
+WATCH_METHODS = ('auto', 'poll')
+
+# Header of each inotify event: the watch, flags, cookie and name length
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Filesystems where inotify does not report changes made by other machines
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'fuse.sshfs', '9p', 'afs'}
+
+
+def _load_inotify():
+    """Returns the C library if it supports inotify (otherwise None)."""
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+def _filesystem_type(path):
+    """Returns the type of the filesystem a path is on (or None if it is unknown)."""
+    path = os.path.realpath(path)
+    mount_point = ''
+    filesystem_type = None
+
+    try:
+        with open('/proc/mounts', 'r', encoding='utf-8') as mounts:
+            for line in mounts:
+                fields = line.split()
+                mount = fields[1].replace('\\040', ' ')
+
+                # The most specific mount point containing the path is the one it is on
+                if os.path.commonpath([path, mount]) == mount and len(mount) >= len(mount_point):
+                    mount_point = mount
+                    filesystem_type = fields[2]
+    except (OSError, ValueError, IndexError):
+        return None
+
+    return filesystem_type
+
+
+class FolderWatcher:
+    """Yields the PDFs added to a directory once they have been written.
+
+        On Linux, the directory is watched with inotify, so new PDFs are
+        seen as soon as they are added. Otherwise (or on network
+        filesystems, where inotify does not see PDFs added by other
+        machines, or if polling is configured) the PDFs in the directory
+        and their stat data are polled at an interval.
+
+        A PDF is only handed on once its size and modification time have
+        not changed for the settle time, so PDFs that are still being
+        written or copied are not read early. Each PDF is handed on once,
+        unless it changes (e.g. is replaced) after being handed on. PDFs
+        already in the directory when watching starts are handed on too.
+    """
+    def _start_inotify(self):
+        """Starts watching the directory with inotify (returning None if it is not available)."""
+        libc = _load_inotify()
+
+        if libc is None:
+            return None
+
+        filesystem_type = _filesystem_type(self.path)
+
+        if filesystem_type in NETWORK_FILESYSTEMS:
+            self.log.info(f'  {self.path} is on a {filesystem_type} filesystem; polling for changes')
+            return None
+
+        descriptor = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+
+        if descriptor < 0:
+            self.log.warning(f'Unable to start inotify ({os.strerror(ctypes.get_errno())}); polling for changes')
+            return None
+
+        mask = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+        if libc.inotify_add_watch(descriptor, os.fsencode(self.path), mask) < 0:
+            self.log.warning(f'Unable to watch {self.path} ({os.strerror(ctypes.get_errno())}); polling for changes')
+            os.close(descriptor)
+            return None
+
+        return descriptor
+
+    def _scan(self):
+        """Returns the size and modification time of each PDF in the directory."""
+        found = {}
+
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.pdf'):
+                    continue
+
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+
+        return found
+
+    def _stat(self, path):
+        """Returns the size and modification time of a PDF (or None if it no longer exists)."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+
+        return stat.st_size, stat.st_mtime_ns
+
+    def _update(self, path, identity, now):
+        """Updates the state of a PDF from its size and modification time (or None if it is gone)."""
+        if identity is None:
+            self.pending.pop(path, None)
+            self.handed_on.pop(path, None)
+            return
+
+        if self.handed_on.get(path) == identity:
+            return
+
+        # Any change restarts the wait for the PDF to settle
+        if path not in self.pending or self.pending[path][0] != identity:
+            self.pending[path] = (identity, now)
+
+    def _rescan(self, now):
+        """Updates the state of every PDF from a scan of the directory."""
+        found = self._scan()
+
+        for path in set(self.pending) | set(self.handed_on):
+            if path not in found:
+                self._update(path, None, now)
+
+        for path, identity in found.items():
+            self._update(path, identity, now)
+
+    def _read_events(self, now):
+        """Updates the state of each PDF named in the waiting inotify events."""
+        try:
+            events = os.read(self.inotify, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        offset = 0
+
+        while offset < len(events):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(events, offset)
+            name = events[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += _EVENT_HEADER.size + length
+
+            # Events were dropped, so the whole directory is checked again
+            if mask & IN_Q_OVERFLOW:
+                self._rescan(now)
+                continue
+
+            if name.endswith(b'.pdf'):
+                path = os.path.join(self.path, os.fsdecode(name))
+                self._update(path, self._stat(path), now)
+
+    def _wait(self, stop):
+        """Waits for changes to the directory (or the next poll)."""
+        if self.inotify is None:
+            stop.wait(self.poll_seconds)
+            self._rescan(monotonic())
+            return
+
+        # Wake regularly to check for settled PDFs and whether to stop
+        ready, _, _ = select.select([self.inotify], [], [], 0.5)
+
+        if ready:
+            self._read_events(monotonic())
+
+    def _settled(self, now):
+        """Yields each pending PDF that has not changed for the settle time."""
+        for path, (identity, changed_at) in list(self.pending.items()):
+            if now - changed_at < self.settle_seconds:
+                continue
+
+            # Confirm the PDF has not changed without an event being seen
+            current = self._stat(path)
+
+            if current != identity:
+                self._update(path, current, now)
+                continue
+
+            # Empty files are still being created
+            if identity[0] == 0:
+                continue
+
+            del self.pending[path]
+            self.handed_on[path] = identity
+
+            yield path
+
+    def watch(self, stop):
+        """Yields the path of each new PDF until the stop event is set."""
+        method = 'inotify' if self.inotify is not None else f'polling every {self.poll_seconds} seconds'
+
+        self.log.info(f'Watching {self.path} for new PDFs ({method})')
+
+        self._rescan(monotonic())
+
+        try:
+            while not stop.is_set():
+                yield from self._settled(monotonic())
+                self._wait(stop)
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops watching the directory."""
+        if self.inotify is not None:
+            os.close(self.inotify)
+            self.inotify = None
+
+    def __init__(self, log, path, settle_seconds=2, poll_seconds=2, method='auto'):
+        self.log = log
+        self.path = os.fspath(path)
+        self.settle_seconds = settle_seconds
+        self.poll_seconds = poll_seconds
+        self.pending = {}
+        self.handed_on = {}
+        self.inotify = self._start_inotify() if method == 'auto' else None
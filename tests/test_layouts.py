@@ -0,0 +1,62 @@
+"""Tests the labels used to extract pages of each version of the pay advice layout."""
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import fitz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'benchmarks'))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'extract'))
+
+import synthetic  # pylint: disable=wrong-import-position
+from utils.extraction import PaychequeData  # pylint: disable=wrong-import-position
+
+
+class LayoutTest(unittest.TestCase):
+    """Extracts the TAX DATA of synthetic paycheques with new, old and mixed labels."""
+    def _extract_tax_data(self, labels):
+        """Generates a paycheque with the given TAX DATA labels and extracts its TAX DATA."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'paycheque.pdf'
+
+            with mock.patch.dict(synthetic.TAX_DATA_LABELS, {'old': labels}):
+                synthetic.generate_paycheque(path, seed=1, old_labels=True)
+
+            data = PaychequeData(fitz.open(path), self.log)
+
+            try:
+                return data.layout.name, data.get_table('tax_data')
+            finally:
+                data.close()
+
+    def setUp(self):
+        self.log = logging.getLogger('ahs-paycheque-extraction-test')
+        self.log.setLevel(logging.ERROR)
+
+    def test_versions_extract_the_same_data(self):
+        """Pages with the new or old labels extract the same TAX DATA."""
+        new_layout, new_data = self._extract_tax_data(synthetic.TAX_DATA_LABELS['new'])
+        old_layout, old_data = self._extract_tax_data(synthetic.TAX_DATA_LABELS['old'])
+
+        self.assertEqual((new_layout, old_layout), ('current', 'abbreviated'))
+        self.assertEqual(old_data, new_data)
+
+    def test_mixed_labels_fall_back_label_by_label(self):
+        """A page mixing old and new labels extracts each one with the label on the page."""
+        _, new_data = self._extract_tax_data(synthetic.TAX_DATA_LABELS['new'])
+
+        for signature in ('new', 'old'):
+            with self.subTest(signature=signature):
+                labels = list(synthetic.TAX_DATA_LABELS['new' if signature == 'old' else 'old'])
+                labels[0] = synthetic.TAX_DATA_LABELS[signature][0]
+
+                _, mixed_data = self._extract_tax_data(labels)
+
+                self.assertEqual(mixed_data, new_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
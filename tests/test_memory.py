@@ -0,0 +1,33 @@
+"""Checks that the memory of an extraction run stays flat as the number of PDFs grows."""
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'benchmarks'))
+
+import memory  # pylint: disable=wrong-import-position
+
+
+class MemoryTest(unittest.TestCase):
+    """Runs a shortened version of benchmarks/memory.py over synthetic paycheques."""
+    def test_memory_stays_flat(self):
+        """The peak memory after the warm-up does not grow through the run."""
+        log = logging.getLogger('ahs-paycheque-extraction-test')
+        log.setLevel(logging.ERROR)
+
+        with tempfile.TemporaryDirectory() as corpus:
+            pdf_files = memory.prepare_corpus(Path(corpus), 400, 2)
+            samples = memory.run_benchmark(pdf_files, 2, 0.05, log)
+
+        self.assertGreaterEqual(len(samples), 20)
+
+        first_peak, second_peak, growth = memory.measure_growth(samples, 0.2)
+
+        self.assertLess(
+            growth, 20, f'Peak memory grew from {first_peak:.1f} MB to {second_peak:.1f} MB through the run'
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Tests the timings and peak memory recorded for each stage of an extraction."""
+from pathlib import Path
+import sys
+from threading import Thread
+import tracemalloc
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'extract'))
+
+from utils.metrics import Metrics  # pylint: disable=wrong-import-position
+
+
+class MetricsTest(unittest.TestCase):
+    """Tests the stages timed by Metrics."""
+    def setUp(self):
+        tracemalloc.start()
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def test_nested_stage_keeps_outer_peak(self):
+        """A nested stage does not reset the peak memory of the stage it is in."""
+        metrics = Metrics()
+
+        with metrics.time('outer'):
+            allocation = bytearray(4_000_000)
+            del allocation
+
+            with metrics.time('inner'):
+                pass
+
+        self.assertGreaterEqual(metrics.memory['outer'], 4_000_000)
+        self.assertNotIn('inner', metrics.memory)
+        self.assertIn('inner', metrics.timings)
+
+    def test_other_thread_stage_does_not_record_peak(self):
+        """A stage timed in another thread does not reset the peak memory of the main thread's stage."""
+        metrics = Metrics()
+        thread_metrics = Metrics()
+
+        def run_stage():
+            with thread_metrics.time('thread'):
+                pass
+
+        with metrics.time('main'):
+            allocation = bytearray(4_000_000)
+            del allocation
+
+            thread = Thread(target=run_stage)
+            thread.start()
+            thread.join()
+
+        self.assertGreaterEqual(metrics.memory['main'], 4_000_000)
+        self.assertEqual(thread_metrics.memory, {})
+        self.assertIn('thread', thread_metrics.timings)
+
+if __name__ == '__main__':
+    unittest.main()